@@ -11,7 +11,7 @@ import pandas as pd
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException, Query, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, Response
+from fastapi.responses import FileResponse, ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from PIL import Image
 from pydantic import BaseModel
@@ -47,7 +47,7 @@ from app.f1_data import (
     get_constructor_standings_async,
     get_driver_details_async,
     get_constructor_details_async,
-    sort_standings_zero_last,
+    standings_records,
     _get_latest_quali_async,
     get_quali_for_round_async,
     get_race_results_async,
@@ -60,7 +60,7 @@ from app.f1_data import (
     get_season_schedule_short,
 )
 from app.handlers.races import build_next_race_payload
-from app.services.admin_feedback_service import send_admin_feedback
+from app.services.admin_feedback_service import close_feedback_bot, send_admin_feedback
 from app.services.prediction_service import (
     PREDICTION_FIELDS,
     PREDICTION_SCORING_RULES,
@@ -97,10 +97,16 @@ async def lifespan(app: FastAPI):
     try:
         yield
     finally:
+        await close_feedback_bot()
         await db.close()
 
 
-web_app = FastAPI(title="FormulaOneBot Mini App API", lifespan=lifespan)
+# Ответы API (таблицы, расписания, результаты) сериализуем через orjson — быстрее stdlib json
+web_app = FastAPI(
+    title="FormulaOneBot Mini App API",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 web_origins = [
     origin.strip()
@@ -352,7 +358,7 @@ async def api_next_race(
                     dt = datetime.fromisoformat(s["utc_iso"])
                     if dt.tzinfo is None:
                         dt = dt.replace(tzinfo=timezone.utc)
-                except:
+                except (TypeError, ValueError):
                     pass
 
             if dt is None and isinstance(s.get("date"), datetime):
@@ -692,37 +698,31 @@ async def api_drivers(
     if season is None:
         season = datetime.now().year
 
-    df = await get_driver_standings_async(season, round_number)
+    rows = standings_records(await get_driver_standings_async(season, round_number))
 
-    if df.empty:
+    if not rows:
         return {"season": season, "round": round_number, "drivers": []}
 
-    if "position" in df.columns:
-        df["position"] = pd.to_numeric(df["position"], errors="coerce")
-        df = sort_standings_zero_last(df)
-
-    df = df.fillna("")
-
     favorite_drivers = set()
     if user_id:
         favorite_drivers = set(await get_favorite_drivers(user_id))
 
     results = []
-    for row in df.itertuples(index=False):
-        driver_code = getattr(row, "driverCode", "")
-        if not driver_code and getattr(row, "familyName", ""):
-            driver_code = getattr(row, "familyName", "")[:3].upper()
+    for row in rows:
+        driver_code = row.get("driverCode", "")
+        if not driver_code and row.get("familyName", ""):
+            driver_code = row.get("familyName", "")[:3].upper()
 
-        driver_id = getattr(row, "driverId", "") or (driver_code.lower() if driver_code else "")
+        driver_id = row.get("driverId", "") or (driver_code.lower() if driver_code else "")
         results.append({
-            "position": getattr(row, "position", ""),
-            "points": getattr(row, "points", 0),
+            "position": row.get("position", ""),
+            "points": row.get("points", 0),
             "code": driver_code,
-            "name": f"{getattr(row, 'givenName', '')} {getattr(row, 'familyName', '')}",
+            "name": f"{row.get('givenName', '')} {row.get('familyName', '')}",
             "is_favorite": driver_code in favorite_drivers,
-            "number": getattr(row, "permanentNumber", "") or "",
-            "constructorId": getattr(row, "constructorId", "") or "",
-            "constructorName": getattr(row, "constructorName", "") or "",
+            "number": row.get("permanentNumber", "") or "",
+            "constructorId": row.get("constructorId", "") or "",
+            "constructorName": row.get("constructorName", "") or "",
             "driverId": driver_id,
         })
 
@@ -795,29 +795,23 @@ async def api_constructors(
     if season is None:
         season = datetime.now().year
 
-    df = await get_constructor_standings_async(season, round_number)
+    rows = standings_records(await get_constructor_standings_async(season, round_number))
 
-    if df.empty:
+    if not rows:
         return {"season": season, "round": round_number, "constructors": []}
 
-    if "position" in df.columns:
-        df["position"] = pd.to_numeric(df["position"], errors="coerce")
-        df = sort_standings_zero_last(df)
-
-    df = df.fillna("")
-
     favorite_teams = set()
     if user_id:
         favorite_teams = set(await get_favorite_teams(user_id))
 
     results = []
-    for row in df.itertuples(index=False):
-        team_name = getattr(row, "constructorName", "")
+    for row in rows:
+        team_name = row.get("constructorName", "")
         results.append({
-            "position": getattr(row, "position", ""),
-            "points": getattr(row, "points", 0),
+            "position": row.get("position", ""),
+            "points": row.get("points", 0),
             "name": team_name,
-            "constructorId": getattr(row, "constructorId", "") or "",
+            "constructorId": row.get("constructorId", "") or "",
             "is_favorite": team_name in favorite_teams
         })
 
@@ -1052,25 +1046,23 @@ def _should_reset_previous_results(schedule: list, now: datetime, results_round:
 
 def _get_latest_started_quali_round(schedule: list, now: datetime) -> Optional[int]:
     """Последний этап, квалификация которого уже началась согласно расписанию."""
-    started_rounds: list[int] = []
+    latest_round: Optional[int] = None
     for event in schedule:
         qualifying_at = _parse_utc_iso(event.get("quali_start_utc"))
-        if qualifying_at is not None:
-            if qualifying_at <= now:
-                try:
-                    started_rounds.append(int(event["round"]))
-                except (KeyError, TypeError, ValueError):
-                    continue
-            continue
-
-        # Старые записи расписания могут не содержать времени сессии.
         try:
-            if datetime.fromisoformat(str(event.get("date") or "")).date() <= now.date():
-                started_rounds.append(int(event["round"]))
+            if qualifying_at is not None:
+                started = qualifying_at <= now
+            else:
+                # Старые записи расписания могут не содержать времени сессии.
+                started = datetime.fromisoformat(str(event.get("date") or "")).date() <= now.date()
+            if started:
+                round_num = int(event["round"])
+                if latest_round is None or round_num > latest_round:
+                    latest_round = round_num
         except (KeyError, TypeError, ValueError):
             continue
 
-    return max(started_rounds) if started_rounds else None
+    return latest_round
 
 
 def _empty_results_payload_during_active_weekend(schedule: list, now: datetime, season: int) -> dict:
@@ -1800,6 +1792,30 @@ def _get_passed_races(schedule: list, now: datetime) -> list:
     return passed
 
 
+def _race_rows_by_code(df: pd.DataFrame) -> dict[str, tuple]:
+    """
+    Код пилота -> (очки, позиция, стартовая позиция) одним проходом по колонкам,
+    без копии таблицы и фильтрации DataFrame на каждого пилота. Дубли кода — первая строка.
+    """
+    size = len(df)
+
+    def _values(column: str | None) -> list:
+        return df[column].tolist() if column and column in df.columns else [None] * size
+
+    codes = (
+        df["Abbreviation"].fillna("").astype(str).str.upper().tolist()
+        if "Abbreviation" in df.columns else [""] * size
+    )
+    grid_col = "GridPosition" if "GridPosition" in df.columns else "Grid"
+    rows: dict[str, tuple] = {}
+    for code, points, position, grid in zip(
+        codes, _values("Points"), _values("Position"), _values(grid_col)
+    ):
+        if code not in rows:
+            rows[code] = (points, position, grid)
+    return rows
+
+
 async def _build_driver_comparison(driver_codes: list[str], season: int):
     """Load one season once and build comparable series for any number of drivers."""
     schedule = await get_season_schedule_short_async(season)
@@ -1871,30 +1887,18 @@ async def _build_driver_comparison(driver_codes: list[str], season: int):
         grid_positions: dict[str, int] = {}
 
         if df is not None and not isinstance(df, Exception) and not df.empty:
-            if "Abbreviation" in df.columns:
-                df = df.copy()
-                df["Abbreviation"] = df["Abbreviation"].fillna("").astype(str).str.upper()
-            else:
-                df = df.copy()
-                df["Abbreviation"] = ""
-
+            race_rows = _race_rows_by_code(df)
             for code in driver_codes:
-                row = df[df["Abbreviation"] == code]
-                if row.empty:
+                race_row = race_rows.get(code)
+                if race_row is None:
                     continue
-                race_row = row.iloc[0]
-                points_value = race_row.get("Points", 0)
-                points = 0.0 if pd.isna(points_value) else float(points_value)
+                points_value, position, grid = race_row
+                points = 0.0 if points_value is None or pd.isna(points_value) else float(points_value)
                 if points == 0:
-                    position = race_row.get("Position")
                     if position is not None and not pd.isna(position):
                         points = float(points_for_race_position(int(position)))
                 round_points[code] = points
 
-                grid = race_row.get(
-                    "GridPosition",
-                    race_row.get("Grid", None),
-                )
                 if grid is not None and not pd.isna(grid):
                     try:
                         grid_positions[code] = int(float(grid))
@@ -3,7 +3,7 @@ import os
 import asyncio
 import aiosqlite
 from pathlib import Path
-from typing import List, Tuple, Any, Optional
+from typing import Iterable, List, Tuple, Any, Optional
 
 # Настройка путей и логгера
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -442,6 +442,20 @@ async def update_user_setting(telegram_id, key: str, value: Any) -> None:
     await db.conn.commit()
 
 
+async def disable_notifications_for(telegram_ids: Iterable[int]) -> None:
+    """
+    Выключает уведомления пользователям, заблокировавшим бота: одним UPDATE после рассылки,
+    чтобы следующие рассылки не стучались в мёртвые чаты. Настройки и избранное не трогаем.
+    """
+    params = [(int(tg_id),) for tg_id in telegram_ids]
+    if not params:
+        return
+    if not db.conn:
+        await db.connect()
+    await db.conn.executemany("UPDATE users SET notifications_enabled = 0 WHERE telegram_id = ?", params)
+    await db.conn.commit()
+
+
 # --- Избранное (пилоты) ---
 async def add_favorite_driver(telegram_id: int, driver_code: str) -> None:
     user_id = await get_or_create_user(telegram_id)
@@ -456,6 +470,13 @@ async def remove_favorite_driver(telegram_id: int, driver_code: str) -> None:
     await db.conn.commit()
 
 
+async def clear_favorite_drivers(telegram_id: int) -> None:
+    """Удаляет всех избранных пилотов пользователя одним DELETE и одним commit."""
+    user_id = await get_or_create_user(telegram_id)
+    await db.conn.execute("DELETE FROM favorite_drivers WHERE user_id = ?", (user_id,))
+    await db.conn.commit()
+
+
 async def get_favorite_drivers(telegram_id: int) -> List[str]:
     user_id = await get_or_create_user(telegram_id)
     async with db.conn.execute("SELECT driver_code FROM favorite_drivers WHERE user_id = ? ORDER BY driver_code",
@@ -479,6 +500,13 @@ async def remove_favorite_team(telegram_id: int, constructor_name: str) -> None:
     await db.conn.commit()
 
 
+async def clear_favorite_teams(telegram_id: int) -> None:
+    """Удаляет все избранные команды пользователя одним DELETE и одним commit."""
+    user_id = await get_or_create_user(telegram_id)
+    await db.conn.execute("DELETE FROM favorite_teams WHERE user_id = ?", (user_id,))
+    await db.conn.commit()
+
+
 async def get_favorite_teams(telegram_id: int) -> List[str]:
     user_id = await get_or_create_user(telegram_id)
     async with db.conn.execute(
@@ -505,26 +533,23 @@ async def get_users_favorites_for_notifications(notifications_only: bool = True)
     if not db.conn: await db.connect()
     notif_filter = " AND u.notifications_enabled = 1" if notifications_only else ""
     result: dict = {}
+    # Пилоты и команды одним запросом: один проход по курсору вместо двух
     async with db.conn.execute(
-        "SELECT u.telegram_id, fd.driver_code FROM users u "
+        "SELECT u.telegram_id, 'drivers' AS kind, fd.driver_code AS value FROM users u "
         "JOIN favorite_drivers fd ON fd.user_id = u.id WHERE u.telegram_id IS NOT NULL"
-        f"{notif_filter}"
-    ) as cursor:
-        async for row in cursor:
-            tg_id = row['telegram_id']
-            if tg_id not in result:
-                result[tg_id] = {"drivers": [], "teams": []}
-            result[tg_id]["drivers"].append(str(row['driver_code']).upper())
-    async with db.conn.execute(
-        "SELECT u.telegram_id, ft.constructor_name FROM users u "
+        f"{notif_filter} "
+        "UNION ALL "
+        "SELECT u.telegram_id, 'teams' AS kind, ft.constructor_name AS value FROM users u "
         "JOIN favorite_teams ft ON ft.user_id = u.id WHERE u.telegram_id IS NOT NULL"
         f"{notif_filter}"
     ) as cursor:
-        async for row in cursor:
-            tg_id = row['telegram_id']
-            if tg_id not in result:
-                result[tg_id] = {"drivers": [], "teams": []}
-            result[tg_id]["teams"].append(str(row['constructor_name']))
+        async for tg_id, kind, value in cursor:
+            value = str(value).upper() if kind == "drivers" else str(value)
+            favorites = result.get(tg_id)
+            if favorites is None:
+                favorites = result[tg_id] = {"drivers": [], "teams": []}
+            # kind совпадает с ключом словаря — без отдельной ветки на пилотов/команды
+            favorites[kind].append(value)
     return result
 
 
@@ -605,6 +630,26 @@ async def set_reminder_sent(telegram_id: int, season: int, round_num: int, is_qu
     await db.conn.commit()
 
 
+async def set_reminders_sent(rows: Iterable[Tuple[int, int, int, bool, int]]) -> None:
+    """
+    Пакетная версия set_reminder_sent для рассылок: строки (telegram_id, season, round, is_quali, notify_before_min)
+    пишутся одним executemany и одним commit вместо commit на каждого получателя.
+    """
+    params = [
+        (telegram_id, season, round_num, 1 if is_quali else 0, notify_before_min)
+        for telegram_id, season, round_num, is_quali, notify_before_min in rows
+    ]
+    if not params:
+        return
+    if not db.conn:
+        await db.connect()
+    await db.conn.executemany(
+        "INSERT OR IGNORE INTO event_reminder_sent (telegram_id, season, round, is_quali, notify_before_min) VALUES (?, ?, ?, ?, ?)",
+        params,
+    )
+    await db.conn.commit()
+
+
 async def get_last_notified_round(season: int) -> int | None: return await _get_round_value(season,
                                                                                             "last_notified_round")
 
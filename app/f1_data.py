@@ -14,6 +14,7 @@ from urllib.parse import unquote
 import aiohttp
 import certifi
 import fastf1
+import numpy as np
 import pandas as pd
 from fastf1._api import SessionNotAvailableError
 from fastf1.ergast import Ergast
@@ -95,13 +96,23 @@ def sort_standings_zero_last(df: pd.DataFrame, position_col: str = "position") -
     """
     if df is None or df.empty or position_col not in df.columns:
         return df
-    df = df.copy()
-    pos = pd.to_numeric(df[position_col], errors="coerce")
-    # 0 и NaN в конец: задаём ключ сортировки (0/NaN -> большое число)
-    sort_key = pos.fillna(999).replace(0, 999)
-    df["_sort_key"] = sort_key
-    df = df.sort_values("_sort_key").drop(columns=["_sort_key"])
-    return df
+    pos = pd.to_numeric(df[position_col], errors="coerce").to_numpy(dtype=float)
+    # 0 и NaN в конец: ключ сортировки без временной колонки, iloc сам вернёт новую таблицу
+    sort_key = np.where(np.isnan(pos) | (pos == 0), np.inf, pos)
+    return df.iloc[np.argsort(sort_key, kind="stable")]
+
+
+def standings_records(df: pd.DataFrame, position_col: str = "position") -> list[dict]:
+    """
+    Таблица зачёта для API: позиция числом, 0/NaN в конце, пропуски — "".
+    Исходный DataFrame не меняется (он может лежать в кэше).
+    """
+    if df is None or df.empty:
+        return []
+    if position_col in df.columns:
+        df = df.assign(**{position_col: pd.to_numeric(df[position_col], errors="coerce")})
+        df = sort_standings_zero_last(df, position_col)
+    return df.fillna("").to_dict("records")
 
 
 async def init_redis_cache(redis_url: str):
@@ -1618,7 +1629,8 @@ async def _get_latest_quali_async(season: int, max_round: int | None = None, lim
     # Когда session_key=latest не Qualifying — пробуем последний этап с прошедшей квалификацией
     schedule = await get_season_schedule_short_async(season)
     now = datetime.now(timezone.utc)
-    passed_quali_rounds = []
+    # Один проход: сразу держим максимум, без промежуточного списка
+    last_quali_round = None
     for r in (schedule or []):
         try:
             qutc = r.get("quali_start_utc")
@@ -1627,10 +1639,10 @@ async def _get_latest_quali_async(season: int, max_round: int | None = None, lim
                 if qdt.tzinfo is None:
                     qdt = qdt.replace(tzinfo=timezone.utc)
                 if now > qdt and (max_round is None or r["round"] <= max_round):
-                    passed_quali_rounds.append(r["round"])
+                    if last_quali_round is None or r["round"] > last_quali_round:
+                        last_quali_round = r["round"]
         except Exception:
             continue
-    last_quali_round = max(passed_quali_rounds) if passed_quali_rounds else None
     if last_quali_round is not None:
         round_num, results = await openf1_get_quali_for_round(season, last_quali_round, limit=limit)
         if results:
@@ -1692,7 +1704,7 @@ async def warmup_cache(season: int | None = None):
             d = _date.fromisoformat(r["date"])
             if d <= now:
                 last_round = r["round"]
-        except:
+        except (KeyError, TypeError, ValueError):
             pass
 
     if last_round:
@@ -2,6 +2,7 @@ import asyncio
 import logging
 import time
 from datetime import datetime, timezone
+from operator import itemgetter
 
 from aiogram import Router, F
 from aiogram.filters import Command
@@ -28,6 +29,10 @@ class CompareState(StatesGroup):
 
 
 # --- Вспомогательная функция для клавиатуры ---
+_by_name = itemgetter("name")
+_name_code = itemgetter("name", "code")
+
+
 def build_drivers_keyboard(
     drivers: list[dict],
     prefix: str,
@@ -35,23 +40,18 @@ def build_drivers_keyboard(
     favorite_codes: set[str] | None = None,
 ) -> InlineKeyboardMarkup:
     """drivers: [{"code": "VER", "name": "Verstappen"}, ...]. Кнопки показывают имя, callback — код."""
-    builder = []
-    row = []
     fav = favorite_codes or set()
-    sorted_drivers = sorted(drivers, key=lambda d: d["name"])
-    for d in sorted_drivers:
-        if exclude_code and d["code"] == exclude_code:
-            continue
-        label = d["name"][:20] if len(d["name"]) > 20 else d["name"]
-        if d["code"] in fav:
-            label = f"⭐ {label}"
-        row.append(InlineKeyboardButton(text=label, callback_data=f"{prefix}{d['code']}"))
-        if len(row) == 3:
-            builder.append(row)
-            row = []
-    if row:
-        builder.append(row)
-    return InlineKeyboardMarkup(inline_keyboard=builder)
+    buttons = [
+        InlineKeyboardButton(
+            text=f"⭐ {name[:20]}" if code in fav else name[:20],
+            callback_data=prefix + code,
+        )
+        for name, code in map(_name_code, sorted(drivers, key=_by_name))
+        if not (exclude_code and code == exclude_code)
+    ]
+    # По 3 кнопки в ряд
+    rows = [buttons[i:i + 3] for i in range(0, len(buttons), 3)]
+    return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
 # --- 2. Старт диалога ---
@@ -210,7 +210,8 @@ async def send_comparison_graph(
         f"⏳ Начинаю анализ гонок..."
     )
 
-    async with Loader(message, text_init) as loader:
+    # Прогресс здесь реальный (N / M гонок через update), фоновая анимация не нужна
+    async with Loader(message, text_init, animate=False) as loader:
         schedule = await get_season_schedule_short_async(year)
 
         current_year = datetime.now().year
@@ -224,7 +225,7 @@ async def send_comparison_graph(
                     if r_dt.tzinfo is None: r_dt = r_dt.replace(tzinfo=timezone.utc)
                     if r_dt <= now:
                         passed_races.append(r)
-                except:
+                except (TypeError, ValueError):
                     pass
             elif year < current_year:
                 passed_races.append(r)
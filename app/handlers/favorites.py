@@ -5,10 +5,11 @@ from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.filters import Command
 
 from app.db import (
-    get_favorite_drivers, add_favorite_driver, remove_favorite_driver,
-    get_favorite_teams, add_favorite_team, remove_favorite_team
+    get_favorite_drivers, add_favorite_driver, remove_favorite_driver, clear_favorite_drivers,
+    get_favorite_teams, add_favorite_team, remove_favorite_team, clear_favorite_teams
 )
 from app.f1_data import get_driver_standings_async, get_constructor_standings_async, sort_standings_zero_last
+from app.utils.notifications import invalidate_users_cache
 
 router = Router()
 
@@ -176,6 +177,7 @@ async def cb_toggle_driver(call: CallbackQuery):
         await remove_favorite_driver(user_id, code)
     else:
         await add_favorite_driver(user_id, code)
+    invalidate_users_cache()
 
     markup, text = await _build_drivers_keyboard(user_id)
     try:
@@ -194,6 +196,7 @@ async def cb_toggle_team(call: CallbackQuery):
         await remove_favorite_team(user_id, team_name)
     else:
         await add_favorite_team(user_id, team_name)
+    invalidate_users_cache()
 
     markup, text = await _build_teams_keyboard(user_id)
     try:
@@ -221,9 +224,8 @@ async def ask_clear_drivers(call: CallbackQuery):
 @router.callback_query(F.data == "confirm_clear_drivers")
 async def confirm_clear_drivers(call: CallbackQuery):
     user_id = call.from_user.id
-    current_favs = await get_favorite_drivers(user_id)
-    for code in current_favs:
-        await remove_favorite_driver(user_id, code)
+    await clear_favorite_drivers(user_id)
+    invalidate_users_cache()
 
     markup, text = await _build_drivers_keyboard(user_id)
     await call.message.edit_text(text=text, reply_markup=markup, parse_mode="Markdown")
@@ -247,9 +249,8 @@ async def ask_clear_teams(call: CallbackQuery):
 @router.callback_query(F.data == "confirm_clear_teams")
 async def confirm_clear_teams(call: CallbackQuery):
     user_id = call.from_user.id
-    current_favs = await get_favorite_teams(user_id)
-    for team in current_favs:
-        await remove_favorite_team(user_id, team)
+    await clear_favorite_teams(user_id)
+    invalidate_users_cache()
 
     markup, text = await _build_teams_keyboard(user_id)
     await call.message.edit_text(text=text, reply_markup=markup, parse_mode="Markdown")
@@ -1,4 +1,5 @@
 import asyncio
+import re
 
 import pandas as pd
 from collections import defaultdict
@@ -168,7 +169,7 @@ async def build_next_race_payload(season: int | None = None, user_id: int | None
         try:
             utc_dt = datetime.fromisoformat(race_start_utc_str)
             utc_str = utc_dt.strftime("%d.%m.%Y %H:%M UTC")
-        except:
+        except (TypeError, ValueError):
             utc_str = race_start_utc_str
 
     return {
@@ -793,7 +794,11 @@ async def races_year_current(callback: CallbackQuery, state: FSMContext) -> None
     await safe_answer_callback(callback)
 
 
+# "/races 2007" -> 2007: команда и один числовой аргумент
+_SEASON_ARG_RE = re.compile(r"\S+\s+(\d+)")
+
+
 def _parse_season_from_text(text: str) -> int:
-    parts = text.strip().split(maxsplit=1)
-    if len(parts) == 2 and parts[1].isdigit(): return int(parts[1])
+    m = _SEASON_ARG_RE.fullmatch(text.strip())
+    if m: return int(m.group(1))
     return datetime.now().year
\ No newline at end of file
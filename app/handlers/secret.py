@@ -41,7 +41,7 @@ from app.utils.notifications import (
     build_favorites_caption,
     is_quiet_hours,
 )
-from app.utils.safe_send import safe_send_media_group, safe_send_message, safe_send_photo
+from app.utils.safe_send import broadcast, safe_send_media_group, safe_send_message, safe_send_photo
 
 logger = logging.getLogger(__name__)
 router = Router()
@@ -218,7 +218,7 @@ async def cmd_check_results(message: Message):
                 if r_dt.tzinfo is None: r_dt = r_dt.replace(tzinfo=timezone.utc)
                 if r_dt > now:
                     continue  # Будущее
-            except:
+            except (TypeError, ValueError):
                 pass
 
         # 2. Качаем результаты
@@ -364,7 +364,6 @@ async def cmd_test_notify(message: Message, command: CommandObject, bot):
             disable_notification=is_quiet_hours(tz_map[tg_id]),
         ):
             sent_1 += 1
-        await asyncio.sleep(0.05)
     await status.edit_text(f"✅ 1/4 отправлено ({sent_1}/{len(users)}). Готовлю 2/4...")
 
     # 2) После квалификации — картинка + все пилоты под спойлером
@@ -420,7 +419,6 @@ async def cmd_test_notify(message: Message, command: CommandObject, bot):
                 disable_notification=is_quiet_hours(tz_map[tg_id]),
             ):
                 sent_2 += 1
-            await asyncio.sleep(0.05)
     else:
         for tg_id in tz_map:
             if await safe_send_message(
@@ -429,7 +427,6 @@ async def cmd_test_notify(message: Message, command: CommandObject, bot):
                 disable_notification=is_quiet_hours(tz_map[tg_id]),
             ):
                 sent_2 += 1
-            await asyncio.sleep(0.05)
     await status.edit_text(f"✅ 2/4 отправлено ({sent_2}/{len(users)}). Готовлю 3/4...")
 
     # 3) Перед гонкой
@@ -441,7 +438,6 @@ async def cmd_test_notify(message: Message, command: CommandObject, bot):
             disable_notification=is_quiet_hours(tz_map[tg_id]),
         ):
             sent_3 += 1
-        await asyncio.sleep(0.05)
     await status.edit_text(f"✅ 3/4 отправлено ({sent_3}/{len(users)}). Готовлю 4/4...")
 
     # 4) После гонки — картинка + все пилоты и команды под спойлером
@@ -563,7 +559,6 @@ async def cmd_test_notify(message: Message, command: CommandObject, bot):
                 disable_notification=is_quiet_hours(tz_map[tg_id]),
             ):
                 sent_4 += 1
-            await asyncio.sleep(0.05)
     else:
         for tg_id in tz_map:
             if await safe_send_message(
@@ -572,7 +567,6 @@ async def cmd_test_notify(message: Message, command: CommandObject, bot):
                 disable_notification=is_quiet_hours(tz_map[tg_id]),
             ):
                 sent_4 += 1
-            await asyncio.sleep(0.05)
 
     await status.delete()
     await message.answer(
@@ -651,7 +645,6 @@ async def cmd_test_voting_results(message: Message, command: CommandObject, bot)
             disable_notification=is_quiet_hours(tz_map[tg_id]),
         ):
             sent += 1
-        await asyncio.sleep(0.05)
 
     await status.delete()
     await message.answer(f"✅ Итоги голосования отправлены: {sent}/{len(users)}")
@@ -717,63 +710,58 @@ async def admin_silent_broadcast(message: Message, command: CommandObject):
     # (tg_id, tz, notify_before, notifications_enabled)
     await message.answer(f"🏁 Рассылка для {len(users)} пользователей (в обход настроек уведомлений)...")
 
-    success_count = 0
-    batch_size = 20
-    for batch_start in range(0, len(users), batch_size):
-        for user in users[batch_start:batch_start + batch_size]:
-            tg_id = user[0]
-            tz = user[1] or "Europe/Moscow"
-            quiet = is_quiet_hours(tz)
-            try:
-                caption_fits_media = bool(text_to_send) and len(plain_text_to_send) <= 1024
-                send_text_separately = bool(photo_file_ids and text_to_send and not caption_fits_media)
-                if len(photo_file_ids) > 1:
-                    media = [
-                        InputMediaPhoto(
-                            media=file_id,
-                            caption=text_to_send if index == 0 and caption_fits_media else None,
-                            parse_mode="HTML" if index == 0 and caption_fits_media else None,
-                        )
-                        for index, file_id in enumerate(photo_file_ids[:10])
-                    ]
-                    ok = await safe_send_media_group(
-                        message.bot,
-                        tg_id,
-                        media,
-                        disable_notification=quiet,
-                    )
-                elif photo_file_ids:
-                    ok = await safe_send_photo(
-                        message.bot,
-                        tg_id,
-                        photo_file_ids[0],
-                        caption=text_to_send if caption_fits_media else None,
-                        parse_mode="HTML" if caption_fits_media else None,
-                        disable_notification=quiet,
-                    )
-                else:
-                    ok = await _send_broadcast_text(
-                        message.bot,
-                        tg_id,
-                        text_to_send,
-                        plain_text_to_send,
-                        disable_notification=quiet,
-                    )
-                if ok and send_text_separately:
-                    ok = await _send_broadcast_text(
-                        message.bot,
-                        tg_id,
-                        text_to_send,
-                        plain_text_to_send,
-                        disable_notification=quiet,
-                    )
-                if ok:
-                    success_count += 1
-            except Exception:
-                logger.exception("Broadcast delivery failed for %s", tg_id)
-            await asyncio.sleep(0.06)
-        if batch_start + batch_size < len(users):
-            await asyncio.sleep(1.0)
+    # Темп задаёт общий SEND_LIMITER в safe_send, поэтому ручные паузы между
+    # сообщениями не нужны: отправки идут пулом воркеров через broadcast
+    caption_fits_media = bool(text_to_send) and len(plain_text_to_send) <= 1024
+    send_text_separately = bool(photo_file_ids and text_to_send and not caption_fits_media)
+
+    async def _deliver(user) -> bool:
+        tg_id = user[0]
+        tz = user[1] or "Europe/Moscow"
+        quiet = is_quiet_hours(tz)
+        if len(photo_file_ids) > 1:
+            media = [
+                InputMediaPhoto(
+                    media=file_id,
+                    caption=text_to_send if index == 0 and caption_fits_media else None,
+                    parse_mode="HTML" if index == 0 and caption_fits_media else None,
+                )
+                for index, file_id in enumerate(photo_file_ids[:10])
+            ]
+            ok = await safe_send_media_group(
+                message.bot,
+                tg_id,
+                media,
+                disable_notification=quiet,
+            )
+        elif photo_file_ids:
+            ok = await safe_send_photo(
+                message.bot,
+                tg_id,
+                photo_file_ids[0],
+                caption=text_to_send if caption_fits_media else None,
+                parse_mode="HTML" if caption_fits_media else None,
+                disable_notification=quiet,
+            )
+        else:
+            ok = await _send_broadcast_text(
+                message.bot,
+                tg_id,
+                text_to_send,
+                plain_text_to_send,
+                disable_notification=quiet,
+            )
+        if ok and send_text_separately:
+            ok = await _send_broadcast_text(
+                message.bot,
+                tg_id,
+                text_to_send,
+                plain_text_to_send,
+                disable_notification=quiet,
+            )
+        return ok
+
+    success_count = await broadcast(users, _deliver)
 
     await message.answer(
         f"✅ <b>Рассылка завершена</b>\n"
@@ -7,6 +7,7 @@ from aiogram.types import Message
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 from app.db import get_user_settings, update_user_setting
+from app.utils.notifications import invalidate_users_cache
 from app.utils.safe_send import safe_answer_callback
 
 settings_router = Router()
@@ -188,6 +189,7 @@ async def cb_toggle_notifications(callback: types.CallbackQuery, state: FSMConte
 
     # Сохраняем в БД (передаем как int: 1 или 0)
     await update_user_setting(callback.from_user.id, "notifications_enabled", int(new_status))
+    invalidate_users_cache()
 
     # Перерисовываем меню, чтобы лампочка сменилась с 🔴 на 🟢
     await _show_main_settings(callback, state, callback.from_user.id, is_edit=True)
@@ -204,6 +206,7 @@ async def cb_change_tz(callback: types.CallbackQuery, state: FSMContext):
 async def cb_set_tz(callback: types.CallbackQuery, state: FSMContext):
     new_tz = callback.data.split(":", 1)[1]
     await update_user_setting(callback.from_user.id, "timezone", new_tz)
+    invalidate_users_cache()
     await _show_main_settings(callback, state, callback.from_user.id, is_edit=True)
 
 
@@ -221,6 +224,7 @@ async def cb_change_notify(callback: types.CallbackQuery, state: FSMContext):
 async def cb_set_notify(callback: types.CallbackQuery, state: FSMContext):
     minutes = int(callback.data.split(":")[1])
     await update_user_setting(callback.from_user.id, "notify_before", minutes)
+    invalidate_users_cache()
     await _show_main_settings(callback, state, callback.from_user.id, is_edit=True)
 
 
@@ -17,6 +17,7 @@ from app.f1_data import init_redis_cache, warmup_cache
 from app.handlers import account_link, start, races, drivers, teams, favorites, secret, settings, compare, feedback, groups
 from app.middlewares.error_logging import ErrorLoggingMiddleware
 from app.utils.backup import create_backup
+from app.utils.image_render import start_image_warmup
 from app.utils.notifications import (
     check_and_send_notifications,
     check_and_send_results,
@@ -46,6 +47,8 @@ def setup_logging():
     logging.getLogger("aiosqlite").setLevel(logging.WARNING)
     logging.getLogger("httpcore").setLevel(logging.WARNING)
     logging.getLogger("httpx").setLevel(logging.WARNING)
+    # APScheduler пишет «Running job …/executed successfully» на INFO на каждый тик (каждые 30 с)
+    logging.getLogger("apscheduler").setLevel(logging.WARNING)
 
 
 setup_logging()
@@ -160,6 +163,7 @@ async def main():
 
     # Запускаем прогрев кэша в фоне сразу при старте скрипта
     asyncio.create_task(warmup_cache())
+    start_image_warmup()
 
     # 5. Сбрасываем старые апдейты (чтобы бот не обрабатывал клики, сделанные пока он лежал)
     await bot.delete_webhook(drop_pending_updates=True)
@@ -181,8 +185,18 @@ async def main():
             logger.warning(f"Ошибка при закрытии сессии бота: {exc}")
 
 
+def _run(coro) -> None:
+    """Запуск event loop: uvloop на Linux/macOS (быстрее стандартного), asyncio — где его нет (Windows)."""
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(coro)
+    else:
+        uvloop.run(coro)
+
+
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        _run(main())
     except (KeyboardInterrupt, SystemExit):
         print("Bot stopped!")
@@ -2,11 +2,32 @@ import html
 import os
 
 from aiogram import Bot
+from aiogram.client.default import DefaultBotProperties
+from aiogram.enums import ParseMode
 
 from app.admin_config import get_primary_admin_telegram_id
 from app.db import db
 from app.utils.safe_send import safe_send_message
 
+# Один Bot (и его HTTP-сессия) на процесс: keep-alive соединение к Telegram
+# переиспользуется между сообщениями, без TLS-рукопожатия на каждую отправку.
+_bot: Bot | None = None
+
+
+def _get_bot(token: str) -> Bot:
+    global _bot
+    if _bot is None or _bot.token != token:
+        _bot = Bot(token=token, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+    return _bot
+
+
+async def close_feedback_bot() -> None:
+    """Закрывает сессию общего Bot (вызывается при остановке API)."""
+    global _bot
+    if _bot is not None:
+        await _bot.session.close()
+        _bot = None
+
 
 async def send_admin_feedback(
     sender_name: str,
@@ -54,11 +75,7 @@ async def send_admin_feedback(
         f"<b>Сообщение:</b>\n{html.escape(body)}"
     )
 
-    bot = Bot(token=token)
-    try:
-        delivered = await safe_send_message(bot, admin_id, text, parse_mode="HTML")
-    finally:
-        await bot.session.close()
+    delivered = await safe_send_message(_get_bot(token), admin_id, text)
     if not delivered:
         raise RuntimeError("Telegram не подтвердил доставку сообщения администратору")
 
@@ -23,7 +23,7 @@ from app.services.prediction_service import (
     score_prediction_round,
 )
 from app.utils.notifications import get_users_with_settings, is_quiet_hours
-from app.utils.safe_send import safe_send_message
+from app.utils.safe_send import broadcast, safe_send_message
 
 
 logger = logging.getLogger(__name__)
@@ -42,6 +42,21 @@ def _prediction_open_trigger(sessions: list[dict]) -> datetime | None:
     return min(candidates) if candidates else None
 
 
+async def _send_to_users(bot: Bot, users: list[tuple], text: str) -> int:
+    """Общая рассылка одного текста: тихие часы считаются по таймзоне каждого пользователя."""
+
+    async def _send(user: tuple) -> bool:
+        telegram_id, tz, *_ = user
+        return await safe_send_message(
+            bot,
+            telegram_id,
+            text,
+            disable_notification=is_quiet_hours(tz or "Europe/Moscow"),
+        )
+
+    return await broadcast(users, _send)
+
+
 async def _send_prediction_opened(bot: Bot, event: dict, users: list[tuple]) -> int:
     mini_app_url = os.getenv("MINI_APP_URL", "").strip().rstrip("/")
     link_line = f"\n\n🔗 {mini_app_url}/predictions" if mini_app_url else ""
@@ -58,18 +73,7 @@ async def _send_prediction_opened(bot: Bot, event: dict, users: list[tuple]) ->
         "⏳ Приём закроется строго в момент начала первой квалификации уикенда."
         f"{link_line}"
     )
-    sent = 0
-    for telegram_id, tz, *_ in users:
-        if await safe_send_message(
-            bot,
-            telegram_id,
-            text,
-            parse_mode="HTML",
-            disable_notification=is_quiet_hours(tz or "Europe/Moscow"),
-        ):
-            sent += 1
-        await asyncio.sleep(0.05)
-    return sent
+    return await _send_to_users(bot, users, text)
 
 
 async def _send_prediction_results(
@@ -93,18 +97,7 @@ async def _send_prediction_results(
         + "\n".join(lines)
         + "\n\nОбщая таблица доступна в разделе «Прогнозы»."
     )
-    sent = 0
-    for telegram_id, tz, *_ in users:
-        if await safe_send_message(
-            bot,
-            telegram_id,
-            text,
-            parse_mode="HTML",
-            disable_notification=is_quiet_hours(tz or "Europe/Moscow"),
-        ):
-            sent += 1
-        await asyncio.sleep(0.05)
-    return sent
+    return await _send_to_users(bot, users, text)
 
 
 async def check_and_notify_predictions(bot: Bot) -> None:
@@ -1,24 +1,52 @@
+import functools
 import hashlib
 import io
 import json
 import math
-import urllib
+import re
+import threading
+import time
+import urllib.parse
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
 from io import BytesIO
+from itertools import accumulate
 from pathlib import Path
 from typing import List, Tuple, Callable, Optional
 
 import matplotlib
+import numpy as np
 import pandas as pd
+import urllib3
 from PIL import Image, ImageDraw, ImageFont
 from matplotlib import pyplot as plt, ticker
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
 
 matplotlib.use('Agg')
 
 _DRIVER_PHOTOS_CACHE = {}
 _TEAM_LOGOS_CACHE = {}
+# Уже уменьшенные аватарки/логотипы: (ключ исходника, размер) -> RGBA
+_DRIVER_AVATAR_CACHE: dict[tuple[str, int], Image.Image] = {}
+_TEAM_LOGO_CACHE_RESIZED: dict[tuple[str, int], Image.Image] = {}
+_TEAM_THUMB_CACHE: dict[tuple[str, int], Image.Image] = {}
+# Метка в Image.info: альфа уже обрезана по кругу, вклеивать без отдельной маски
+_THUMB_INFO_KEY = "circular_thumb"
+# Дисковый кэш скачанных картинок — переживает перезапуск бота
+_IMAGE_DISK_CACHE_DIR = Path(__file__).resolve().parents[2] / "f1bot_cache" / "images"
+DRIVER_PHOTO_DISK_TTL = 7 * 24 * 3600
+TEAM_LOGO_DISK_TTL = 30 * 24 * 3600
 _OPENF1_DRIVERS_CACHE = {}
 _OPENF1_FETCHED = False
+# После неудачного запроса к OpenF1 следующая попытка — не раньше чем через OPENF1_RETRY_DELAY секунд
+OPENF1_RETRY_DELAY = 5 * 60
+_OPENF1_RETRY_AT = 0.0
+_OPENF1_LOCK = threading.Lock()
+_COMPARISON_FIG: tuple[Figure, Axes] | None = None
+_COMPARISON_FIG_LOCK = threading.Lock()
 
 # Визуальные константы (Modern Dark Theme)
 BG_GRADIENT_TOP = (25, 30, 45)
@@ -31,6 +59,12 @@ ACCENT_RED = (225, 6, 0)
 # Сдвиг текста по вертикали
 TEXT_V_SHIFT = -15
 
+# Удаляет ⭐ и вариационный селектор U+FE0F за один проход по строке
+_STAR_STRIP = str.maketrans("", "", "\u2B50\uFE0F")
+
+# Размер аватарки в карточке таблицы
+AVATAR_SIZE = 90
+
 
 # --- Загрузка шрифтов ---
 def _load_fonts() -> tuple[
@@ -59,45 +93,46 @@ def _load_fonts() -> tuple[
 FONT_TITLE, FONT_SUBTITLE, FONT_ROW, FONT_EMOJI, FONT_TABLE = _load_fonts()
 
 
+_TEAM_KEY_STRIP_RE = re.compile(r"[^a-z0-9]+")
+
+
+@functools.lru_cache(maxsize=256)
 def _normalize_team_key(text: str) -> str:
-    import re
     s = (str(text) or "").lower()
     s = s.replace("&", "and")
-    return re.sub(r"[^a-z0-9]+", "", s)
+    return _TEAM_KEY_STRIP_RE.sub("", s)
 
 
 # --- Рисование геометрических примитивов ---
 
+# Единичная 5-конечная звезда: 10 вершин (внешний радиус 1, внутренний 0.45), начиная с верхней точки
+_STAR_ANGLES = -math.pi / 2 + np.arange(10) * (math.pi / 5)  # шаг 36 градусов
+_STAR_RADII = np.where(np.arange(10) % 2 == 0, 1.0, 0.45)
+_STAR_UNIT = np.stack([_STAR_RADII * np.cos(_STAR_ANGLES), _STAR_RADII * np.sin(_STAR_ANGLES)], axis=1)
+
+
 def _draw_star(draw: ImageDraw.ImageDraw, cx: int, cy: int, r: int, color: tuple):
     """
     Рисует 5-конечную звезду векторно.
     cx, cy - центр звезды
     r - внешний радиус (размер)
     """
-    points = []
-    # 5 лучей, внешний радиус R, внутренний r*0.4
-    inner_r = r * 0.45
-
-    # Начинаем с -90 градусов (верхняя точка)
-    angle_start = -math.pi / 2
+    points = _STAR_UNIT * r + (cx, cy)
+    draw.polygon([tuple(p) for p in points.tolist()], fill=color)
 
-    for i in range(10):
-        angle = angle_start + i * (math.pi / 5)  # шаг 36 градусов
-        radius = r if i % 2 == 0 else inner_r
-        x = cx + radius * math.cos(angle)
-        y = cy + radius * math.sin(angle)
-        points.append((x, y))
 
-    draw.polygon(points, fill=color)
-
-
-def _generate_placeholder_avatar(text: str, size: int = 90) -> Image.Image:
-    """Генерирует аватарку с инициалами."""
+@functools.lru_cache(maxsize=256)
+def _generate_placeholder_avatar(text: str, size: int = AVATAR_SIZE) -> Image.Image:
+    """
+    Генерирует аватарку с инициалами.
+    Результат кэшируется и разделяется между вызовами — не изменять на месте.
+    """
     text = str(text or "?").strip()
-    h = hashlib.md5(text.encode('utf-8')).hexdigest()
-    r = int(h[0:2], 16) % 100 + 50
-    g = int(h[2:4], 16) % 100 + 50
-    b = int(h[4:6], 16) % 100 + 50
+    # Хэш нужен только для стабильного цвета, криптостойкость не важна
+    h = zlib.crc32(text.encode('utf-8'))
+    r = (h & 0xFF) % 100 + 50
+    g = ((h >> 8) & 0xFF) % 100 + 50
+    b = ((h >> 16) & 0xFF) % 100 + 50
     color = (r, g, b)
 
     img = Image.new("RGBA", (size, size), (0, 0, 0, 0))
@@ -112,7 +147,7 @@ def _generate_placeholder_avatar(text: str, size: int = 90) -> Image.Image:
 
     try:
         font = FONT_ROW
-        w, h_text = _text_size(draw, initials, font)
+        w, h_text = _text_size(initials, font)
         draw.text(((size - w) / 2, (size - h_text) / 2 + TEXT_V_SHIFT / 2), initials, font=font, fill=(255, 255, 255))
     except:
         pass
@@ -120,13 +155,39 @@ def _generate_placeholder_avatar(text: str, size: int = 90) -> Image.Image:
     return img
 
 
-def _download_image(url: str) -> Image.Image | None:
+# Общий пул соединений: OpenF1, Википедия и CDN с фото — keep-alive вместо нового TLS на каждый запрос
+_HTTP = urllib3.PoolManager(
+    num_pools=8,
+    maxsize=16,
+    headers={'User-Agent': 'FormulaOneBot/1.0'},
+    retries=urllib3.Retry(connect=2, read=0, redirect=5),
+)
+
+
+def _http_get(url: str, timeout: float, headers: dict | None = None) -> bytes:
+    """GET через общий пул; как и urlopen, бросает исключение на HTTP-ошибку."""
+    response = _HTTP.request("GET", url, headers=headers, timeout=timeout)
+    if response.status >= 400:
+        raise urllib3.exceptions.HTTPError(f"HTTP {response.status} for {url}")
+    return response.data
+
+
+def _decode_image(data: bytes, max_side: int | None = None) -> Image.Image:
+    """
+    Декодирует картинку в RGBA. Если задан max_side, JPEG декодируется сразу в уменьшенном
+    масштабе (Image.draft, DCT-даунсемплинг 1/2..1/8) — не меньше max_side по каждой стороне.
+    """
+    im = Image.open(BytesIO(data))
+    if max_side:
+        im.draft("RGB", (max_side, max_side))
+    return im.convert("RGBA")
+
+
+def _download_image(url: str, max_side: int | None = None) -> Image.Image | None:
     """Универсальный скачиватель картинок в оперативную память"""
     try:
-        req = urllib.request.Request(url, headers={'User-Agent': 'FormulaOneBot/1.0 (Contact: admin@example.com)'})
-        with urllib.request.urlopen(req, timeout=4) as response:
-            img_data = response.read()
-            return Image.open(BytesIO(img_data)).convert("RGBA")
+        img_data = _http_get(url, timeout=4, headers={'User-Agent': 'FormulaOneBot/1.0 (Contact: admin@example.com)'})
+        return _decode_image(img_data, max_side)
     except Exception as e:
         print(f"Ошибка загрузки {url}: {e}")
         return None
@@ -138,13 +199,11 @@ def _get_wiki_image_url(query: str) -> str | None:
         safe_query = urllib.parse.quote(query)
         url = f"https://en.wikipedia.org/w/api.php?action=query&prop=pageimages&titles={safe_query}&pithumbsize=400&format=json"
 
-        req = urllib.request.Request(url, headers={'User-Agent': 'FormulaOneBot/1.0'})
-        with urllib.request.urlopen(req, timeout=3) as response:
-            data = json.loads(response.read().decode())
-            pages = data.get("query", {}).get("pages", {})
-            for page_id, page_info in pages.items():
-                if "thumbnail" in page_info:
-                    return page_info["thumbnail"]["source"]
+        data = json.loads(_http_get(url, timeout=3).decode())
+        pages = data.get("query", {}).get("pages", {})
+        for page_id, page_info in pages.items():
+            if "thumbnail" in page_info:
+                return page_info["thumbnail"]["source"]
     except Exception:
         pass
     return None
@@ -170,6 +229,23 @@ _CAR_TEAM_ALIASES: dict[str, list[str]] = {
 _CAR_GENERIC_WORDS = {"f1", "team", "racing", "formula", "grand", "prix", "bull"}
 
 
+@functools.lru_cache(maxsize=64)
+def _list_dir_files(dir_path: Path) -> tuple[Path, ...]:
+    """
+    Файлы папки ассетов, отсортированные по имени. Кэшируется на время жизни процесса,
+    чтобы не делать readdir/stat на каждый поиск (после подкладывания новых файлов — cache_clear()).
+    """
+    if not dir_path.is_dir():
+        return ()
+    return tuple(sorted((f for f in dir_path.iterdir() if f.is_file()), key=lambda p: p.name))
+
+
+@functools.lru_cache(maxsize=64)
+def _list_asset_stems(dir_path: Path) -> tuple[tuple[str, Path], ...]:
+    """(нормализованное имя без расширения, путь) для поиска по подстроке."""
+    return tuple((f.stem.strip().lower(), f) for f in _list_dir_files(dir_path))
+
+
 def get_car_image_path(team_name: str, season: int) -> Path | None:
     """Ищет изображение машины: assets/{year}/cars/, fallback — assets/car/."""
     assets_root = Path(__file__).resolve().parents[1] / "assets"
@@ -206,18 +282,16 @@ def get_car_image_path(team_name: str, season: int) -> Path | None:
         return False
 
     def _search_in_dir(dir_path: Path) -> Path | None:
-        if not dir_path.exists():
-            return None
-        for f in sorted(dir_path.iterdir(), key=lambda p: p.name):
-            if f.is_file() and not f.name.startswith(".") and _matches(f):
+        files = [f for f in _list_dir_files(dir_path) if not f.name.startswith(".")]
+        for f in files:
+            if _matches(f):
                 return f
         raw_core = "_".join(w for w in raw.replace(" ", "_").split("_") if w and w not in _CAR_GENERIC_WORDS)
         if raw_core:
-            for f in sorted(dir_path.iterdir(), key=lambda p: p.name):
-                if f.is_file() and not f.name.startswith("."):
-                    stem = f.stem.lower().replace(" ", "_")
-                    if raw_core in stem or stem in raw_core:
-                        return f
+            for f in files:
+                stem = f.stem.lower().replace(" ", "_")
+                if raw_core in stem or stem in raw_core:
+                    return f
         return None
 
     result = _search_in_dir(year_cars)
@@ -227,75 +301,120 @@ def get_car_image_path(team_name: str, season: int) -> Path | None:
     if result:
         return result
     # Generic fallback: первый файл в assets/car/ (для сезонов без своей папки)
-    if fallback_car.exists():
-        for f in sorted(fallback_car.iterdir(), key=lambda p: p.name):
-            if f.is_file() and not f.name.startswith("."):
-                return f
+    for f in _list_dir_files(fallback_car):
+        if not f.name.startswith("."):
+            return f
     return None
 
 
+@functools.lru_cache(maxsize=512)
+def _open_local_image(path: Path) -> Image.Image | None:
+    """Открывает локальный ассет в RGBA один раз за процесс (результат общий — не изменять)."""
+    try:
+        return Image.open(path).convert("RGBA")
+    except Exception:
+        return None
+
+
 def get_asset_path(year: int, category: str, target_name: str) -> Path | None:
     """Универсальный поиск локальных картинок (.png, .avif) в папке assets/YYYY/"""
     if not target_name:
         return None
 
     base_dir = Path(__file__).resolve().parents[1] / "assets" / str(year) / category
-    if not base_dir.exists():
-        return None
-
-    search_name = target_name.replace("⭐️", "").replace("⭐", "").strip().lower()
+    search_name = target_name.translate(_STAR_STRIP).strip().lower()
 
-    for file_path in base_dir.iterdir():
-        if file_path.is_file() and search_name in file_path.stem.strip().lower():
+    for stem, file_path in _list_asset_stems(base_dir):
+        if search_name in stem:
             return file_path
     return None
 
 
-def _get_online_driver_url(code: str, name: str) -> str | None:
-    """ВСЕГДА ищет онлайн-ссылку на фото пилота из OpenF1 API."""
-    global _OPENF1_DRIVERS_CACHE, _OPENF1_FETCHED
+def _ensure_openf1_drivers() -> None:
+    """
+    Один раз за процесс загружает ссылки на фото из OpenF1.
+    Кто придёт во время загрузки — ждёт на блокировке, а не запускает второй запрос и не читает ещё пустой кэш.
+    Если запрос не удался (сеть ещё не поднялась и т.п.), повторяем не чаще раза в OPENF1_RETRY_DELAY.
+    """
+    global _OPENF1_FETCHED, _OPENF1_RETRY_AT
 
-    if not _OPENF1_FETCHED:
-        _OPENF1_FETCHED = True
+    if _OPENF1_FETCHED:
+        return
+    with _OPENF1_LOCK:
+        if _OPENF1_FETCHED or time.monotonic() < _OPENF1_RETRY_AT:
+            return
         try:
-            req = urllib.request.Request("https://api.openf1.org/v1/drivers?session_key=latest",
-                                         headers={'User-Agent': 'Mozilla/5.0'})
-            with urllib.request.urlopen(req, timeout=5) as response:
-                data = json.loads(response.read().decode())
-                for d in data:
-                    url = d.get('headshot_url')
-                    if url:
-                        acronym = d.get('name_acronym', '').strip().upper()
-                        full_name = d.get('full_name', '').strip().lower()
-                        if acronym:
-                            _OPENF1_DRIVERS_CACHE[acronym] = url
-                        if full_name:
-                            _OPENF1_DRIVERS_CACHE[full_name] = url
+            raw = _http_get("https://api.openf1.org/v1/drivers?session_key=latest", timeout=5,
+                            headers={'User-Agent': 'Mozilla/5.0'})
+            data = json.loads(raw.decode())
+            for d in data:
+                url = d.get('headshot_url')
+                if url:
+                    acronym = d.get('name_acronym', '').strip().upper()
+                    full_name = d.get('full_name', '').strip().lower()
+                    if acronym:
+                        _OPENF1_DRIVERS_CACHE[acronym] = url
+                    if full_name:
+                        _OPENF1_DRIVERS_CACHE[full_name] = url
         except Exception as e:
+            _OPENF1_RETRY_AT = time.monotonic() + OPENF1_RETRY_DELAY
             print(f"Ошибка получения ссылок OpenF1: {e}")
+            return
+        _OPENF1_FETCHED = True
+
+
+def _get_online_driver_url(code: str, name: str) -> str | None:
+    """ВСЕГДА ищет онлайн-ссылку на фото пилота из OpenF1 API."""
+    _ensure_openf1_drivers()
 
-    clean_code = code.replace("⭐️", "").replace("⭐", "").strip().upper()
+    clean_code = code.translate(_STAR_STRIP).strip().upper()
     clean_name = name.strip().lower()
 
     return _OPENF1_DRIVERS_CACHE.get(clean_code) or _OPENF1_DRIVERS_CACHE.get(clean_name)
 
 
+def _disk_cache_path(kind: str, cache_key: str) -> Path:
+    safe_key = hashlib.sha1(cache_key.encode("utf-8")).hexdigest()
+    return _IMAGE_DISK_CACHE_DIR / kind / f"{safe_key}.png"
+
+
+def _disk_cache_get(kind: str, cache_key: str, ttl: int) -> Image.Image | None:
+    """Картинка из дискового кэша, если файл есть и моложе ttl секунд."""
+    path = _disk_cache_path(kind, cache_key)
+    try:
+        if time.time() - path.stat().st_mtime > ttl:
+            return None
+        return Image.open(path).convert("RGBA")
+    except (OSError, ValueError):
+        return None
+
+
+def _disk_cache_set(kind: str, cache_key: str, img: Image.Image) -> None:
+    path = _disk_cache_path(kind, cache_key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        img.save(path, format="PNG", optimize=False, compress_level=PNG_COMPRESS_LEVEL)
+    except OSError as e:
+        print(f"Не удалось сохранить {cache_key} в дисковый кэш: {e}")
+
+
 def _get_driver_photo(code: str, name: str, season: int) -> Image.Image | None:
     """Мастер-функция: скачивает онлайн или берет из папки для любого года."""
     cache_key = f"{season}_{code}_{name}"
     if cache_key in _DRIVER_PHOTOS_CACHE:
         return _DRIVER_PHOTOS_CACHE[cache_key]
 
-    img = None
+    # 0. Скачанное в прошлых запусках
+    img = _disk_cache_get("drivers", cache_key, DRIVER_PHOTO_DISK_TTL)
 
     # 1. МАГИЯ ОНЛАЙНА: Пытаемся получить фото с официальных серверов (работает всегда)
-    online_url = _get_online_driver_url(code, name)
+    online_url = _get_online_driver_url(code, name) if not img else None
     if online_url:
         try:
-            req = urllib.request.Request(online_url, headers={'User-Agent': 'Mozilla/5.0'})
-            with urllib.request.urlopen(req, timeout=5) as response:
-                img_data = response.read()
-                img = Image.open(BytesIO(img_data)).convert("RGBA")
+            img_data = _http_get(online_url, timeout=5, headers={'User-Agent': 'Mozilla/5.0'})
+            # Фото нужно только для аватарок AVATAR_SIZE — полное разрешение не декодируем
+            img = _decode_image(img_data, AVATAR_SIZE * 2)
+            _disk_cache_set("drivers", cache_key, img)
         except Exception as e:
             print(f"Не удалось скачать {name}: {e}")
 
@@ -306,10 +425,7 @@ def _get_driver_photo(code: str, name: str, season: int) -> Image.Image | None:
             img_path = get_asset_path(season, "pilots", code)
 
         if img_path:
-            try:
-                img = Image.open(img_path).convert("RGBA")
-            except Exception:
-                pass
+            img = _open_local_image(img_path)
 
     # 3. Сохраняем результат в кэш
     if img:
@@ -341,16 +457,19 @@ def _get_team_logo(code: str, name: str, season: int) -> Image.Image | None:
             break
 
     if img_path:
-        try:
-            img = Image.open(img_path).convert("RGBA")
-        except Exception:
-            pass
+        img = _open_local_image(img_path)
+
+    # ШАГ 2: Скачанное с Википедии в прошлых запусках
+    if not img:
+        img = _disk_cache_get("teams", cache_key, TEAM_LOGO_DISK_TTL)
 
-    # ШАГ 2: Википедия (добавляем " Formula One", чтобы точно найти лого Ф1, а не обычные машины)
+    # ШАГ 3: Википедия (добавляем " Formula One", чтобы точно найти лого Ф1, а не обычные машины)
     if not img:
         wiki_url = _get_wiki_image_url(f"{name} Formula One")
         if wiki_url:
-            img = _download_image(wiki_url)
+            img = _download_image(wiki_url, AVATAR_SIZE * 2)
+            if img:
+                _disk_cache_set("teams", cache_key, img)
 
     if img:
         _TEAM_LOGOS_CACHE[cache_key] = img
@@ -358,26 +477,206 @@ def _get_team_logo(code: str, name: str, season: int) -> Image.Image | None:
     return img
 
 
-def _text_size(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.FreeTypeFont) -> Tuple[int, int]:
+def _resample_for(src_size: tuple[int, int], size: int) -> int:
+    """
+    Фильтр уменьшения до size×size: LANCZOS нужен только при сильном сжатии,
+    для исходников до ~3× больше цели BILINEAR визуально неотличим и заметно дешевле.
+    """
+    return Image.LANCZOS if max(src_size) > size * 3 else Image.BILINEAR
+
+
+def _make_circular_thumb(img: Image.Image, size: int) -> Image.Image:
+    """Готовая к вклейке круглая аватарка: альфа-канал уже равен круглой маске."""
+    thumb = img.resize((size, size), _resample_for(img.size, size)) if img.size != (size, size) else img.copy()
+    if thumb.mode != "RGBA":
+        thumb = thumb.convert("RGBA")
+    thumb.putalpha(_circle_mask(size))
+    thumb.info[_THUMB_INFO_KEY] = True
+    return thumb
+
+
+@functools.lru_cache(maxsize=256)
+def _placeholder_thumb(text: str, size: int = AVATAR_SIZE) -> Image.Image:
+    """Заглушка с инициалами в виде готовой круглой миниатюры (общая, не изменять на месте)."""
+    return _make_circular_thumb(_generate_placeholder_avatar(text, size), size)
+
+
+def _get_driver_avatar(code: str, name: str, season: int, size: int = AVATAR_SIZE) -> Image.Image | None:
+    """Фото пилота: уменьшено до size×size и обрезано по кругу один раз, дальше из кэша."""
+    cache_key = (f"{season}_{code}_{name}", size)
+    if cache_key in _DRIVER_AVATAR_CACHE:
+        return _DRIVER_AVATAR_CACHE[cache_key]
+
+    img = _get_driver_photo(code, name, season)
+    if img is None:
+        return None
+
+    avatar = _make_circular_thumb(img, size)
+    _DRIVER_AVATAR_CACHE[cache_key] = avatar
+    return avatar
+
+
+def _get_team_logo_resized(code: str, name: str, season: int, size: int = AVATAR_SIZE) -> Image.Image | None:
+    """Логотип команды, уже уменьшенный до size×size."""
+    cache_key = (f"{season}_{code}_{name}", size)
+    if cache_key in _TEAM_LOGO_CACHE_RESIZED:
+        return _TEAM_LOGO_CACHE_RESIZED[cache_key]
+
+    img = _get_team_logo(code, name, season)
+    if img is None:
+        return None
+
+    logo = img.resize((size, size), _resample_for(img.size, size))
+    _TEAM_LOGO_CACHE_RESIZED[cache_key] = logo
+    return logo
+
+
+def _get_team_thumb(code: str, name: str, season: int, size: int = AVATAR_SIZE) -> Image.Image | None:
+    """Логотип команды для карточки зачёта — круглый, как аватарки пилотов."""
+    cache_key = (f"{season}_{code}_{name}", size)
+    if cache_key in _TEAM_THUMB_CACHE:
+        return _TEAM_THUMB_CACHE[cache_key]
+
+    logo = _get_team_logo_resized(code, name, season, size)
+    if logo is None:
+        return None
+
+    thumb = _make_circular_thumb(logo, size)
+    _TEAM_THUMB_CACHE[cache_key] = thumb
+    return thumb
+
+
+# Общий «черновик» для измерения текста, чтобы не создавать временные картинки на каждый вызов
+_MEASURE_IMG = Image.new("RGB", (8, 8))
+_MEASURE_DRAW = ImageDraw.Draw(_MEASURE_IMG)
+
+
+@functools.lru_cache(maxsize=8)
+def _circle_mask(size: int) -> Image.Image:
+    """Круглая маска аватарки; paste её только читает, так что один объект на размер безопасен."""
+    mask = Image.new("L", (size, size), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, size, size), fill=255)
+    return mask
+
+
+def _prefetch_avatars(
+        avatar_loader: Callable[[str, str], Image.Image | None],
+        keys: list[tuple[str, str]],
+) -> dict[tuple[str, str], Image.Image | None]:
+    """
+    Загружает аватарки всех строк параллельно: загрузчики ждут сеть (GIL отпущен),
+    поэтому ~20 последовательных запросов схлопываются примерно в один.
+    """
+    unique_keys = list(dict.fromkeys(keys))
+    if not unique_keys:
+        return {}
+    try:
+        with ThreadPoolExecutor(max_workers=min(8, len(unique_keys))) as pool:
+            return dict(zip(unique_keys, pool.map(lambda key: avatar_loader(*key), unique_keys)))
+    except Exception as e:
+        print(f"Ошибка параллельной загрузки аватарок: {e}")
+        return {}
+
+
+@functools.lru_cache(maxsize=4096)
+def _text_size(text: str, font: ImageFont.FreeTypeFont, draw: ImageDraw.ImageDraw | None = None) -> Tuple[int, int]:
+    draw = draw or _MEASURE_DRAW
     if hasattr(draw, "textbbox"):
         bbox = draw.textbbox((0, 0), text, font=font)
         return bbox[2] - bbox[0], bbox[3] - bbox[1]
     return draw.textsize(text, font=font)
 
 
+def _fit_text(text: str, font: ImageFont.FreeTypeFont, max_w: int) -> tuple[str, int]:
+    """
+    Обрезает текст с «…», чтобы влез в max_w. Возвращает (строка, высота для вертикального выравнивания).
+    Длина префикса ищется бинарным поиском: O(log N) измерений вместо одного на каждый символ.
+    """
+    text_w, text_h = _text_size(text, font)
+    if not text or text_w <= max_w:
+        return text, text_h
+
+    lo, hi = 0, len(text) - 1
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if _text_size(text[:mid] + "…", font)[0] <= max_w:
+            lo = mid
+        else:
+            hi = mid - 1
+    fitted = text[:lo] + "…"
+    return fitted, _text_size(fitted, font)[1]
+
+
+def _draw_text_with_shadow(
+        img: Image.Image,
+        xy: tuple[int, int],
+        text: str,
+        font: ImageFont.FreeTypeFont,
+        fill: tuple,
+        shadow_fill: tuple = SHADOW_COLOR,
+        shadow_offset: tuple[int, int] = (2, 2),
+) -> None:
+    """Текст с тенью: глифы растеризуются в маску один раз, маска вклеивается дважды."""
+    left, top, right, bottom = font.getbbox(text)
+    ox, oy = min(left, 0), min(top, 0)
+    if right - ox <= 0 or bottom - oy <= 0:
+        return
+    mask = Image.new("L", (right - ox, bottom - oy), 0)
+    ImageDraw.Draw(mask).text((-ox, -oy), text, font=font, fill=255)
+
+    x, y = int(xy[0]) + ox, int(xy[1]) + oy
+    img.paste(shadow_fill, (x + shadow_offset[0], y + shadow_offset[1]), mask)
+    img.paste(fill, (x, y), mask)
+
+
+_CARD_SHADOW_OFFSET = 6
+_CARD_RADIUS = 24
+_CARD_STRIP_WIDTH = 12
+
+
+@functools.lru_cache(maxsize=64)
+def _get_card_template(width: int, height: int, accent: tuple[int, int, int]) -> Image.Image:
+    """
+    Статичная геометрия карточки (тень + фон + рамка + цветная полоска) в RGBA.
+    Акцентных цветов всего несколько (подиум + остальные), поэтому кэш почти всегда попадает,
+    и строка рисуется одним img.paste(tpl, xy, tpl) вместо нескольких rounded_rectangle.
+    """
+    off = _CARD_SHADOW_OFFSET
+    strip = _CARD_STRIP_WIDTH
+    tpl = Image.new("RGBA", (width + off + 1, height + off + 1), (0, 0, 0, 0))
+    tpl_draw = ImageDraw.Draw(tpl)
+    tpl_draw.rounded_rectangle((off, off, width + off, height + off), radius=_CARD_RADIUS, fill=SHADOW_COLOR)
+    tpl_draw.rounded_rectangle((0, 0, width, height), radius=_CARD_RADIUS, fill=CARD_BG_COLOR,
+                               outline=(60, 65, 80), width=1)
+    tpl_draw.rounded_rectangle((0, 0, strip, height), radius=_CARD_RADIUS, fill=accent)
+    tpl_draw.rectangle((strip - 5, 0, strip, height), fill=accent)
+    return tpl
+
+
+# Картинки одноразовые (уходят в Telegram), поэтому жмём быстро, а не максимально
+PNG_COMPRESS_LEVEL = 1
+
+
+def _encode_png(img: Image.Image) -> BytesIO:
+    buf = BytesIO()
+    img.save(buf, format="PNG", optimize=False, compress_level=PNG_COMPRESS_LEVEL)
+    buf.seek(0)
+    return buf
+
+
 def _create_vertical_gradient(width: int, height: int, top_color: tuple, bottom_color: tuple) -> Image.Image:
-    base = Image.new('RGB', (width, height), top_color)
-    gradient_strip = Image.new('RGB', (1, height), top_color)
-    draw = ImageDraw.Draw(gradient_strip)
-    r1, g1, b1 = top_color
-    r2, g2, b2 = bottom_color
-    for y in range(height):
-        ratio = y / height
-        r = int(r1 + (r2 - r1) * ratio)
-        g = int(g1 + (g2 - g1) * ratio)
-        b = int(b1 + (b2 - b1) * ratio)
-        draw.point((0, y), fill=(r, g, b))
-    return gradient_strip.resize((width, height), resample=Image.Resampling.NEAREST)
+    # Копия, потому что поверх фона дальше рисуют
+    return _build_gradient_cached(width, height, tuple(top_color), tuple(bottom_color)).copy()
+
+
+@functools.lru_cache(maxsize=32)
+def _build_gradient_cached(width: int, height: int, top_color: tuple, bottom_color: tuple) -> Image.Image:
+    # Интерполяция по строкам одной операцией NumPy вместо цикла по пикселям
+    ratio = (np.arange(height, dtype=np.float64) / height)[:, None]
+    top = np.asarray(top_color, dtype=np.float64)
+    bottom = np.asarray(bottom_color, dtype=np.float64)
+    strip = (top + (bottom - top) * ratio).astype(np.uint8).reshape(height, 1, 3)
+    return Image.fromarray(strip, "RGB").resize((width, height), resample=Image.Resampling.NEAREST)
 
 
 def create_comparison_image(
@@ -390,26 +689,51 @@ def create_comparison_image(
     driverX_data: {"code": "VER", "history": [25, 18, ...], "color": "#123456"}
     labels: список названий трасс (кратко)
     """
+    global _COMPARISON_FIG
+
     # Настройка стиля (Темная тема F1)
-    plt.style.use('dark_background')
+    with plt.style.context('dark_background'):
+        # Фигура переиспользуется между вызовами; параллельный вызов (из другого потока) рисует на своей
+        if not _COMPARISON_FIG_LOCK.acquire(blocking=False):
+            return _draw_comparison(_new_comparison_figure(), driver1_data, driver2_data, labels)
+        try:
+            if _COMPARISON_FIG is None:
+                _COMPARISON_FIG = _new_comparison_figure()
+            else:
+                _reset_comparison_figure(*_COMPARISON_FIG)
+            return _draw_comparison(_COMPARISON_FIG, driver1_data, driver2_data, labels)
+        finally:
+            _COMPARISON_FIG_LOCK.release()
+
+
+def _new_comparison_figure() -> tuple[Figure, Axes]:
+    # Размеры и DPI. Figure без pyplot: не регистрируется глобально, закрывать не нужно
+    fig = Figure(figsize=(12, 7), dpi=150)
+    return fig, fig.add_subplot()
+
+
+_SUBPLOT_PARAMS = ("left", "right", "bottom", "top", "wspace", "hspace")
 
-    # Размеры и DPI
-    fig, ax = plt.subplots(figsize=(12, 7), dpi=150)
+
+def _reset_comparison_figure(fig: Figure, ax: Axes) -> None:
+    # tight_layout отталкивается от текущей раскладки — возвращаем исходную, чтобы результат не зависел от истории
+    fig.subplots_adjust(**{k: matplotlib.rcParams[f"figure.subplot.{k}"] for k in _SUBPLOT_PARAMS})
+    ax.clear()
+
+
+def _draw_comparison(
+        fig_ax: tuple[Figure, Axes],
+        driver1_data: dict,
+        driver2_data: dict,
+        labels: List[str]
+) -> BytesIO:
+    fig, ax = fig_ax
     fig.patch.set_facecolor('#1e1e23')  # Цвет фона вокруг графика
     ax.set_facecolor('#1e1e23')  # Цвет поля графика
 
-    # Подготовка данных (кумулятивная сумма)
-    y1 = []
-    current = 0
-    for p in driver1_data["history"]:
-        current += p if p is not None else 0
-        y1.append(current)
-
-    y2 = []
-    current = 0
-    for p in driver2_data["history"]:
-        current += p if p is not None else 0
-        y2.append(current)
+    # Подготовка данных (кумулятивная сумма; int сохраняется для итогового счёта)
+    y1 = list(accumulate(p if p is not None else 0 for p in driver1_data["history"]))
+    y2 = list(accumulate(p if p is not None else 0 for p in driver2_data["history"]))
 
     # Обрезаем данные, если гонок прошло меньше, чем в календаре
     n_races = min(len(y1), len(y2), len(labels))
@@ -440,8 +764,8 @@ def create_comparison_image(
     # --- ОФОРМЛЕНИЕ ---
 
     # Заголовок
-    plt.title(f"Battle: {label1} vs {label2}",
-              fontsize=20, fontweight='bold', color='white', pad=20)
+    ax.set_title(f"Battle: {label1} vs {label2}",
+                 fontsize=20, fontweight='bold', color='white', pad=20)
 
     # Оси
     ax.grid(color='#444444', linestyle='--', linewidth=0.5, alpha=0.5)
@@ -469,15 +793,15 @@ def create_comparison_image(
 
     # Добавляем финальный счет текстом
     final_score_text = f"{y1[-1]} - {y2[-1]}"
-    plt.text(0.98, 0.05, final_score_text, transform=ax.transAxes,
-             fontsize=24, fontweight='bold', color='white', ha='right', alpha=0.3)
+    ax.text(0.98, 0.05, final_score_text, transform=ax.transAxes,
+            fontsize=24, fontweight='bold', color='white', ha='right', alpha=0.3)
 
     # Сохранение
-    plt.tight_layout()
+    fig.tight_layout()
     buf = io.BytesIO()
-    plt.savefig(buf, format='png', facecolor='#1e1e23')
+    fig.savefig(buf, format='png', facecolor='#1e1e23',
+                pil_kwargs={"optimize": False, "compress_level": PNG_COMPRESS_LEVEL})
     buf.seek(0)
-    plt.close(fig)  # Обязательно закрываем, чтобы очистить память
 
     return buf
 
@@ -502,26 +826,26 @@ def create_results_image(
     header_gap = 50
     line_spacing = 30
     row_height = 120
-    avatar_size = 90
+    avatar_size = AVATAR_SIZE
 
     if avatar_loader is None:
+        current_year = datetime.now().year  # один раз на рендер, а не на каждую строку
+
         def avatar_loader(code: str, name: str) -> Image.Image | None:
-            return _get_driver_photo(code, name, datetime.now().year)
+            return _get_driver_avatar(code, name, current_year, avatar_size)
 
-    temp_img = Image.new("RGB", (100, 100))
-    draw_tmp = ImageDraw.Draw(temp_img)
 
-    title_w, title_h = _text_size(draw_tmp, title, FONT_TITLE)
-    subtitle_w, subtitle_h = _text_size(draw_tmp, subtitle, FONT_SUBTITLE)
+    title_w, title_h = _text_size(title, FONT_TITLE)
+    subtitle_w, subtitle_h = _text_size(subtitle, FONT_SUBTITLE)
 
     num_rows = len(safe_rows)
     rows_per_col = (num_rows + 1) // 2
 
-    max_row_text = ""
-    for pos, code, name, pts in safe_rows:
-        candidate = f"{pos}. {name} {pts}000"
-        if len(candidate) > len(max_row_text): max_row_text = candidate
-    row_text_w, _ = _text_size(draw_tmp, max_row_text, FONT_ROW)
+    # Ширина по реальной отрисовке, а не по числу символов (шрифт пропорциональный)
+    row_text_w = max(
+        (_text_size(f"{pos}. {name} {pts}000", FONT_ROW)[0] for pos, _, name, pts in safe_rows),
+        default=0,
+    )
 
     min_width = 1800
     img_width = max(min_width, title_w + 2 * padding, row_text_w + 2 * padding)
@@ -529,12 +853,12 @@ def create_results_image(
                 row_height + line_spacing) + padding
 
     img = _create_vertical_gradient(img_width, img_height, BG_GRADIENT_TOP, BG_GRADIENT_BOT)
-    draw = ImageDraw.Draw(img, "RGBA")
+    # Все заливки непрозрачные (тень уже в шаблоне карточки), так что RGB-режима достаточно
+    draw = ImageDraw.Draw(img)
 
     cur_y = padding
     x_title = (img_width - title_w) // 2
-    draw.text((x_title + 2, cur_y + 2), title, font=FONT_TITLE, fill=(0, 0, 0))
-    draw.text((x_title, cur_y), title, font=FONT_TITLE, fill=(255, 255, 255))
+    _draw_text_with_shadow(img, (x_title, cur_y), title, FONT_TITLE, fill=(255, 255, 255))
     cur_y += title_h + 15
 
     x_sub = (img_width - subtitle_w) // 2
@@ -564,43 +888,52 @@ def create_results_image(
         return (80, 90, 120)
 
     color_for_pos = card_color_func or _default_card_color_for_pos
+    # Цвет акцента считаем один раз на строку, а не внутри отрисовки
+    row_accents = [tuple(color_for_pos(r[0])) for r in safe_rows]
 
-    def _draw_row(col_x: int, row_y: int, pos: str, code: str, name: str, pts: str) -> None:
-        card_x0, card_y0 = col_x, row_y
-        card_x1, card_y1 = col_x + col_width, row_y + row_height
-        accent = color_for_pos(pos)
+    def _avatar_key(code: str, name: str) -> tuple[str, str]:
+        raw_code = code.translate(_STAR_STRIP).strip().upper()
+        return (raw_code if raw_code else name), name
 
-        draw.rounded_rectangle((card_x0 + 6, card_y0 + 6, card_x1 + 6, card_y1 + 6), radius=24, fill=SHADOW_COLOR)
-        draw.rounded_rectangle((card_x0, card_y0, card_x1, card_y1), radius=24, fill=CARD_BG_COLOR,
-                               outline=(60, 65, 80), width=1)
+    prefetched = _prefetch_avatars(avatar_loader, [_avatar_key(code, name) for _, code, name, _ in safe_rows])
 
-        strip_width = 12
-        draw.rounded_rectangle((card_x0, card_y0, card_x0 + strip_width, card_y1), radius=24, fill=accent)
-        draw.rectangle((card_x0 + strip_width - 5, card_y0, card_x0 + strip_width, card_y1), fill=accent)
+    # Инварианты раскладки строки (одинаковы для обеих колонок)
+    pos_offset_x = 24 + _CARD_STRIP_WIDTH
+    pts_right_x = col_width - 24 - 16
+    inner_center_dy = row_height // 2
+    avatar_half = avatar_size // 2
+    star_radius = 16
 
-        inner_y_center = (card_y0 + card_y1) // 2
-        pts_w, pts_h = _text_size(draw, pts, FONT_ROW)
-        pos_w, pos_h = _text_size(draw, pos, FONT_ROW)
+    def _draw_row(col_x: int, row_y: int, row: tuple[str, str, str, str], accent: tuple[int, int, int]) -> None:
+        pos, code, name, pts = row
 
-        pts_x = card_x1 - 24 - pts_w - 16
-        pos_x = card_x0 + 24 + strip_width
+        card_tpl = _get_card_template(col_width, row_height, accent)
+        img.paste(card_tpl, (col_x, row_y), card_tpl)
+
+        inner_y_center = row_y + inner_center_dy
+        pts_w, pts_h = _text_size(pts, FONT_ROW)
+        pos_w, pos_h = _text_size(pos, FONT_ROW)
+
+        pts_x = col_x + pts_right_x - pts_w
+        pos_x = col_x + pos_offset_x
 
         avatar_x = pos_x + max(80, pos_w + 32)
         name_x = avatar_x + avatar_size + 24
 
-        raw_code = code.replace("⭐️", "").replace("⭐", "").strip().upper()
-        lookup_key = raw_code if raw_code else name
-
-        base_img = avatar_loader(lookup_key, name)
+        avatar_key = _avatar_key(code, name)
+        if avatar_key in prefetched:
+            base_img = prefetched[avatar_key]
+        else:
+            base_img = avatar_loader(*avatar_key)
         if base_img is None:
-            base_img = _generate_placeholder_avatar(name or code or "?")
+            base_img = _placeholder_thumb(name or code or "?", avatar_size)
 
         if base_img:
-            avatar = base_img.resize((avatar_size, avatar_size), Image.LANCZOS)
-            mask = Image.new("L", (avatar_size, avatar_size), 0)
-            ImageDraw.Draw(mask).ellipse((0, 0, avatar_size, avatar_size), fill=255)
-            paste_y = inner_y_center - avatar_size // 2
-            img.paste(avatar, (int(avatar_x), int(paste_y)), mask)
+            # Вклеиваем только готовые круглые миниатюры (альфа = круглая маска) — один проход paste
+            # без отдельной маски. Загрузчики этого модуля и заглушки уже отдают их из кэша.
+            if not (base_img.info.get(_THUMB_INFO_KEY) and base_img.size == (avatar_size, avatar_size)):
+                base_img = _make_circular_thumb(base_img, avatar_size)
+            img.paste(base_img, (int(avatar_x), int(inner_y_center - avatar_half)), base_img)
 
         draw.text((pos_x, inner_y_center + TEXT_V_SHIFT - pos_h // 2), pos, font=FONT_ROW, fill=(180, 190, 200))
 
@@ -608,23 +941,16 @@ def create_results_image(
                                fill=(45, 50, 65))
         draw.text((pts_x, inner_y_center + TEXT_V_SHIFT - pts_h // 2), pts, font=FONT_ROW, fill=TEXT_COLOR)
 
-        clean_name = name.replace("⭐️", "").replace("⭐", "").strip()
+        clean_name = name.translate(_STAR_STRIP).strip()
         has_star = "⭐" in name or "⭐" in code
 
-        name_draw = clean_name
-        name_w, name_h = _text_size(draw, name_draw, FONT_ROW)
-        max_name_w = pts_x - name_x - 20
-        while name_draw and name_w > max_name_w:
-            name_draw = name_draw[:-1]
-            name_w, name_h = _text_size(draw, name_draw + "…", FONT_ROW)
-        if name_draw != clean_name: name_draw += "…"
+        name_draw, name_h = _fit_text(clean_name, FONT_ROW, pts_x - name_x - 20)
 
         cur_name_x = name_x
 
         if has_star:
             # --- РИСУЕМ ЗВЕЗДУ ГЕОМЕТРИЧЕСКИ ---
             # Центрируем звезду по вертикали относительно текста
-            star_radius = 16
             star_cx = cur_name_x + star_radius
             # Сдвигаем чуть вниз (TEXT_V_SHIFT обычно поднимает текст, звезду тоже надо поднять)
             star_cy = inner_y_center + TEXT_V_SHIFT
@@ -636,20 +962,15 @@ def create_results_image(
 
     for i in range(rows_per_col):
         row_y = start_y + i * (row_height + line_spacing)
-        if i < len(rows_left): _draw_row(left_x, row_y, *rows_left[i])
-        if i < len(rows_right): _draw_row(right_x, row_y, *rows_right[i])
+        if i < len(rows_left): _draw_row(left_x, row_y, rows_left[i], row_accents[i])
+        j = rows_per_col + i
+        if i < len(rows_right): _draw_row(right_x, row_y, rows_right[i], row_accents[j])
 
-    buf = BytesIO()
-    img.save(buf, format="PNG")
-    buf.seek(0)
-    return buf
+    return _encode_png(img)
 
 
 # Обертки
-def create_driver_standings_image(title: str, subtitle: str, rows: List[Tuple[str, str, str, str]], season: int) -> BytesIO:
-    def _loader(code: str, name: str):
-        return _get_driver_photo(code, name, season) # Прокидываем год
-
+def _standings_color_func(default: tuple[int, int, int]) -> Callable[[str], tuple[int, int, int]]:
     def _color(pos: str):
         try:
             p = int(pos)
@@ -658,26 +979,72 @@ def create_driver_standings_image(title: str, subtitle: str, rows: List[Tuple[st
         if p == 1: return (255, 180, 0)
         if p == 2: return (192, 192, 192)
         if p == 3: return (205, 127, 50)
-        return (80, 100, 140)
+        return default
 
-    return create_results_image(title, subtitle, rows, avatar_loader=_loader, card_color_func=_color)
+    return _color
 
 
-def create_constructor_standings_image(title: str, subtitle: str, rows: List[Tuple[str, str, str, str]], season: int) -> BytesIO:
+# Готовые PNG таблиц зачёта: (вид, заголовок, подзаголовок, строки, сезон) -> bytes.
+# В строки входят ⭐️ избранного конкретного пользователя, поэтому ключи у разных людей
+# разные: попаданий мало, а каждый PNG весит сотни КБ — держим немного последних.
+STANDINGS_PNG_CACHE_SIZE = 16
+_STANDINGS_PNG_CACHE: OrderedDict[tuple, bytes] = OrderedDict()
+_STANDINGS_PNG_LOCK = threading.Lock()
+
+
+def _render_standings_cached(
+        kind: str,
+        title: str,
+        subtitle: str,
+        rows: tuple[tuple[str, str, str, str], ...],
+        season: int,
+) -> bytes:
+    """
+    Таблица зачёта — чистая функция от входных данных, поэтому готовый PNG кэшируется.
+    Возвращаем bytes (неизменяемые), каждый вызывающий получает свой BytesIO.
+    Картинка, где хоть одна аватарка не загрузилась (заглушка с инициалами), в кэш не попадает —
+    следующий запрос снова попробует скачать фото.
+    """
+    key = (kind, title, subtitle, rows, season)
+    with _STANDINGS_PNG_LOCK:
+        cached = _STANDINGS_PNG_CACHE.get(key)
+        if cached is not None:
+            _STANDINGS_PNG_CACHE.move_to_end(key)
+            return cached
+
+    if kind == "drivers":
+        load_avatar = _get_driver_avatar
+        color_func = _standings_color_func((80, 100, 140))
+    else:
+        load_avatar = _get_team_thumb
+        color_func = _standings_color_func((220, 40, 40))
+
+    missed = False
+
     def _loader(code: str, name: str):
-        return _get_team_logo(code, name, season) # Прокидываем год
+        nonlocal missed
+        img = load_avatar(code, name, season)  # Прокидываем год
+        if img is None:
+            missed = True
+        return img
+
+    png = create_results_image(title, subtitle, list(rows), avatar_loader=_loader, card_color_func=color_func).getvalue()
+    if not missed:
+        with _STANDINGS_PNG_LOCK:
+            _STANDINGS_PNG_CACHE[key] = png
+            if len(_STANDINGS_PNG_CACHE) > STANDINGS_PNG_CACHE_SIZE:
+                _STANDINGS_PNG_CACHE.popitem(last=False)
+    return png
 
-    def _color(pos: str):
-        try:
-            p = int(pos)
-        except:
-            p = 99
-        if p == 1: return (255, 180, 0)
-        if p == 2: return (192, 192, 192)
-        if p == 3: return (205, 127, 50)
-        return (220, 40, 40)
 
-    return create_results_image(title, subtitle, rows, avatar_loader=_loader, card_color_func=_color)
+def create_driver_standings_image(title: str, subtitle: str, rows: List[Tuple[str, str, str, str]], season: int) -> BytesIO:
+    rows_key = tuple(tuple(r) for r in rows or ())
+    return BytesIO(_render_standings_cached("drivers", title, subtitle, rows_key, season))
+
+
+def create_constructor_standings_image(title: str, subtitle: str, rows: List[Tuple[str, str, str, str]], season: int) -> BytesIO:
+    rows_key = tuple(tuple(r) for r in rows or ())
+    return BytesIO(_render_standings_cached("constructors", title, subtitle, rows_key, season))
 
 
 def create_quali_results_image(title: str, subtitle: str, rows: List[Tuple[str, str, str, str]]) -> BytesIO:
@@ -727,14 +1094,12 @@ def create_f1_style_classification_image(
     if not rows:
         rows = [{"pos": "-", "driver": "Нет данных", "team": "", "gap_or_time": "-"}]
 
-    temp_img = Image.new("RGB", (100, 100))
-    draw_tmp = ImageDraw.Draw(temp_img)
 
     event_upper = (event_name or "GRAND PRIX").upper()
     session_upper = (session_type or "CLASSIFICATION").upper()
 
-    title_w, title_h = _text_size(draw_tmp, event_upper, FONT_SUBTITLE)
-    sub_w, sub_h = _text_size(draw_tmp, session_upper, FONT_TABLE)
+    title_w, title_h = _text_size(event_upper, FONT_SUBTITLE)
+    sub_w, sub_h = _text_size(session_upper, FONT_TABLE)
 
     is_qualifying = "QUALIFYING" in (session_type or "").upper()
 
@@ -767,9 +1132,9 @@ def create_f1_style_classification_image(
     # Заголовки — чётко по своим колонкам
     draw.rectangle((PADDING, cur_y, img_width - PADDING, cur_y + header_h), fill=HEADER_BG)
     right_label = "PTS" if not is_qualifying else "FASTEST"
-    draw.text((x_pos + (pos_w - _text_size(draw, "POS", FONT_TABLE)[0]) // 2, cur_y + (header_h - _text_size(draw, "1", FONT_TABLE)[1]) // 2 - 2), "POS", font=FONT_TABLE, fill=HEADER_TEXT)
-    draw.text((x_driver, cur_y + (header_h - _text_size(draw, "A", FONT_TABLE)[1]) // 2 - 2), "DRIVER", font=FONT_TABLE, fill=HEADER_TEXT)
-    draw.text((x_right + right_col_w - _text_size(draw, right_label, FONT_TABLE)[0] - CELL_PAD, cur_y + (header_h - _text_size(draw, "A", FONT_TABLE)[1]) // 2 - 2), right_label, font=FONT_TABLE, fill=HEADER_TEXT)
+    draw.text((x_pos + (pos_w - _text_size("POS", FONT_TABLE)[0]) // 2, cur_y + (header_h - _text_size("1", FONT_TABLE)[1]) // 2 - 2), "POS", font=FONT_TABLE, fill=HEADER_TEXT)
+    draw.text((x_driver, cur_y + (header_h - _text_size("A", FONT_TABLE)[1]) // 2 - 2), "DRIVER", font=FONT_TABLE, fill=HEADER_TEXT)
+    draw.text((x_right + right_col_w - _text_size(right_label, FONT_TABLE)[0] - CELL_PAD, cur_y + (header_h - _text_size("A", FONT_TABLE)[1]) // 2 - 2), right_label, font=FONT_TABLE, fill=HEADER_TEXT)
     cur_y += header_h
 
     for i, r in enumerate(rows):
@@ -824,33 +1189,41 @@ def create_f1_style_classification_image(
             except (TypeError, ValueError):
                 right_val = "0"
 
-        draw.text((x_pos + (pos_w - _text_size(draw, pos, FONT_TABLE)[0]) // 2, row_y + (ROW_HEIGHT - _text_size(draw, pos, FONT_TABLE)[1]) // 2 - 2), pos, font=FONT_TABLE, fill=TEXT_COLOR)
+        draw.text((x_pos + (pos_w - _text_size(pos, FONT_TABLE)[0]) // 2, row_y + (ROW_HEIGHT - _text_size(pos, FONT_TABLE)[1]) // 2 - 2), pos, font=FONT_TABLE, fill=TEXT_COLOR)
 
         # DRIVER: [⭐] имя [логотип справа]
         driver_x = x_driver
         if is_fav:
             _draw_star(draw, x_driver + 14, row_y + ROW_HEIGHT // 2, 10, FAV_BORDER)
             driver_x += 28
-        draw.text((driver_x, row_y + (ROW_HEIGHT - _text_size(draw, driver[:18], FONT_TABLE)[1]) // 2 - 2), driver[:18], font=FONT_TABLE, fill=TEXT_COLOR)
+        draw.text((driver_x, row_y + (ROW_HEIGHT - _text_size(driver[:18], FONT_TABLE)[1]) // 2 - 2), driver[:18], font=FONT_TABLE, fill=TEXT_COLOR)
 
-        logo_img = _get_team_logo(team, team, season) if team else None
+        logo_img = _get_team_logo_resized(team, team, season, LOGO_SIZE) if team else None
         logo_x = x_driver + driver_w - LOGO_SIZE - 4
         if logo_img:
-            logo_img = logo_img.resize((LOGO_SIZE, LOGO_SIZE), Image.LANCZOS)
             paste_x = int(logo_x)
             paste_y = row_y + (ROW_HEIGHT - LOGO_SIZE) // 2
             mask = logo_img.split()[3] if logo_img.mode == "RGBA" else None
             img.paste(logo_img, (paste_x, paste_y), mask)
         elif team:
-            draw.text((logo_x, row_y + (ROW_HEIGHT - _text_size(draw, team[:6], FONT_TABLE)[1]) // 2 - 2), team[:6], font=FONT_TABLE, fill=TEXT_COLOR)
+            draw.text((logo_x, row_y + (ROW_HEIGHT - _text_size(team[:6], FONT_TABLE)[1]) // 2 - 2), team[:6], font=FONT_TABLE, fill=TEXT_COLOR)
 
-        right_x = x_right + right_col_w - _text_size(draw, right_val, FONT_TABLE)[0] - CELL_PAD
-        draw.text((right_x, row_y + (ROW_HEIGHT - _text_size(draw, right_val, FONT_TABLE)[1]) // 2 - 2), right_val, font=FONT_TABLE, fill=TEXT_COLOR)
+        right_x = x_right + right_col_w - _text_size(right_val, FONT_TABLE)[0] - CELL_PAD
+        draw.text((right_x, row_y + (ROW_HEIGHT - _text_size(right_val, FONT_TABLE)[1]) // 2 - 2), right_val, font=FONT_TABLE, fill=TEXT_COLOR)
 
-    buf = BytesIO()
-    img.save(buf, format="PNG")
-    buf.seek(0)
-    return buf
+    return _encode_png(img)
+
+
+# Цвета карточек календаря: [предстоящая, завершённая]
+_SEASON_ROW_FILLS = ((35, 45, 40), (35, 30, 30))
+_SEASON_ROW_ACCENTS = ((50, 180, 100), (180, 50, 50))
+
+
+def _parse_iso_date(value, default: date) -> date:
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return default
 
 
 def create_season_image(season: int, races: list[dict]) -> BytesIO:
@@ -858,19 +1231,14 @@ def create_season_image(season: int, races: list[dict]) -> BytesIO:
     if not safe_races: safe_races = [
         {"round": 0, "event_name": "Нет данных", "country": "", "date": date.today().isoformat()}]
 
-    races_with_dates = []
     today = date.today()
-    for r in safe_races:
-        try:
-            rd = date.fromisoformat(r.get("date", ""))
-        except:
-            rd = today
-        races_with_dates.append((r, rd))
+    race_dates = [_parse_iso_date(r.get("date", ""), today) for r in safe_races]
+    # Один векторный проход вместо сравнения в цикле: 0 — впереди, 1 — уже прошла
+    finished_idx = (np.array(race_dates, dtype="datetime64[D]") < np.datetime64(today, "D")).astype(np.intp)
+    races_with_dates = list(zip(safe_races, race_dates))
 
-    temp_img = Image.new("RGB", (100, 100))
-    draw_tmp = ImageDraw.Draw(temp_img)
     title = f"Календарь сезона {season}"
-    title_w, title_h = _text_size(draw_tmp, title, FONT_TITLE)
+    title_w, title_h = _text_size(title, FONT_TITLE)
 
     img_width = 1800
     num_rows = len(races_with_dates)
@@ -898,9 +1266,8 @@ def create_season_image(season: int, races: list[dict]) -> BytesIO:
         row_idx = i if i < rows_per_col else i - rows_per_col
         row_y = start_y + row_idx * (row_height + line_spacing)
 
-        finished = rd < today
-        fill = (35, 30, 30) if finished else (35, 45, 40)
-        accent = (180, 50, 50) if finished else (50, 180, 100)
+        fill = _SEASON_ROW_FILLS[finished_idx[i]]
+        accent = _SEASON_ROW_ACCENTS[finished_idx[i]]
 
         draw.rounded_rectangle((col_x, row_y, col_x + col_width, row_y + row_height), radius=20, fill=fill)
         draw.rounded_rectangle((col_x, row_y, col_x + 10, row_y + row_height), radius=20, fill=accent)
@@ -913,22 +1280,21 @@ def create_season_image(season: int, races: list[dict]) -> BytesIO:
         draw.text((col_x + 100, row_y + 35), ev, font=FONT_ROW, fill=(255, 255, 255))
         draw.text((col_x + col_width - 120, row_y + 35), dt, font=FONT_ROW, fill=(200, 200, 200))
 
-    buf = BytesIO()
-    img.save(buf, format="PNG")
-    buf.seek(0)
-    return buf
+    return _encode_png(img)
 
 
-def create_testing_results_image(results_df, title: str):
+def create_testing_results_image(results_df, title: str) -> BytesIO:
     """
-    Рисует таблицу результатов тестов.
+    Рисует таблицу результатов тестов (Pillow, без matplotlib).
     Колонки: Pos, Driver, Team, Time, Laps
     """
-    # Настройка стилей (темная тема)
-    plt.style.use('dark_background')
-    fig, ax = plt.subplots(figsize=(10, 8))
-    ax.axis('off')
-    fig.patch.set_facecolor('#15151e')
+    TABLE_BG = (21, 21, 30)
+    CELL_BG = (30, 30, 38)
+    CELL_BORDER = (44, 44, 53)
+    PADDING = 40
+    CELL_PAD = 16
+    HEADER_H = 50
+    ROW_HEIGHT = 48
 
     # Подготовка данных
     # FastF1 возвращает: Position, Abbreviation, TeamName, Time, Laps (иногда)
@@ -954,39 +1320,62 @@ def create_testing_results_image(results_df, title: str):
 
         table_data.append([pos, driver, team, time_val, laps])
 
-    # Колонки
+    # Колонки: ширина по самому широкому значению (включая заголовок)
     col_labels = ["Pos", "Driver", "Team", "Best Time", "Laps"]
+    col_widths = [
+        max(_text_size(value, FONT_TABLE)[0] for value in (label, *(r[i] for r in table_data))) + 2 * CELL_PAD
+        for i, label in enumerate(col_labels)
+    ]
+    table_w = sum(col_widths)
 
-    # Рисуем таблицу
-    table = ax.table(
-        cellText=table_data,
-        colLabels=col_labels,
-        loc='center',
-        cellLoc='center',
-        colColours=['#e10600'] * 5
-    )
+    title_w, title_h = _text_size(title, FONT_SUBTITLE)
+    img_width = max(table_w, title_w) + 2 * PADDING
+    img_height = PADDING + title_h + 30 + HEADER_H + len(table_data) * ROW_HEIGHT + PADDING
 
-    # Стилизация таблицы
-    table.auto_set_font_size(False)
-    table.set_fontsize(11)
-    table.scale(1.1, 1.8)
-
-    for key, cell in table.get_celld().items():
-        cell.set_edgecolor('#2c2c35')
-        cell.set_linewidth(1)
-        if key[0] == 0:  # Заголовок
-            cell.set_text_props(weight='bold', color='white')
-            cell.set_facecolor('#e10600')
-        else:
-            cell.set_facecolor('#1e1e26')
-            cell.set_text_props(color='white')
+    img = Image.new("RGB", (img_width, img_height), TABLE_BG)
+    draw = ImageDraw.Draw(img)
 
-    # Заголовок
-    plt.title(f"🧪 {title}", color='white', fontsize=16, pad=20, weight='bold')
+    draw.text(((img_width - title_w) // 2, PADDING), title, font=FONT_SUBTITLE, fill=(255, 255, 255))
+    table_x = (img_width - table_w) // 2
+    cur_y = PADDING + title_h + 30
 
-    # Сохраняем
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', bbox_inches='tight', dpi=150, facecolor='#15151e')
-    buf.seek(0)
-    plt.close(fig)
-    return buf
\ No newline at end of file
+    def _draw_cells(row_y: int, height: int, values: list[str], fill: tuple) -> None:
+        cell_x = table_x
+        for value, width in zip(values, col_widths):
+            draw.rectangle((cell_x, row_y, cell_x + width, row_y + height), fill=fill, outline=CELL_BORDER, width=1)
+            draw.text((cell_x + width // 2, row_y + height // 2), value, font=FONT_TABLE, fill=TEXT_COLOR,
+                      anchor="mm")
+            cell_x += width
+
+    # Заголовок таблицы
+    _draw_cells(cur_y, HEADER_H, col_labels, ACCENT_RED)
+    cur_y += HEADER_H
+
+    for i, row in enumerate(table_data):
+        _draw_cells(cur_y + i * ROW_HEIGHT, ROW_HEIGHT, row, CELL_BG)
+
+    return _encode_png(img)
+
+
+# --- ПРОГРЕВ КЭША ---
+
+def _warm_caches() -> None:
+    """Заранее декодирует фото пилотов и логотипы команд текущего сезона."""
+    season_dir = Path(__file__).resolve().parents[1] / "assets" / str(date.today().year)
+    for category in ("pilots", "teams"):
+        category_dir = season_dir / category
+        if not category_dir.is_dir():
+            continue
+        for file_path in category_dir.iterdir():
+            if file_path.is_file() and not file_path.name.startswith("."):
+                _open_local_image(file_path)
+
+
+def start_image_warmup() -> None:
+    """
+    Прогрев кэша картинок и ссылок на фото OpenF1 в фоне. Вызывается при старте бота, а не при импорте:
+    веб-API и тестам не нужно ни декодировать все ассеты, ни ходить в OpenF1.
+    Декодирование PNG и сеть отпускают GIL, так что первый запрос пользователя уже попадёт в тёплый кэш.
+    """
+    threading.Thread(target=_warm_caches, name="image-cache-warmup", daemon=True).start()
+    threading.Thread(target=_ensure_openf1_drivers, name="openf1-prefetch", daemon=True).start()
@@ -1,71 +1,89 @@
 import asyncio
+import logging
+
 from aiogram.types import Message
-from aiogram.exceptions import TelegramBadRequest
+from aiogram.exceptions import TelegramAPIError
+
+logger = logging.getLogger(__name__)
+
+# Интервалы анимации прогресса, секунды
+ANIMATE_FIRST_INTERVAL = 0.8
+ANIMATE_BACKOFF = 1.3
+ANIMATE_MAX_INTERVAL = 3.0
+
+# Прогресс-бар из 10 блоков (каждый = 10%): всего 11 вариантов, строим один раз
+_BARS = tuple("█" * filled + "░" * (10 - filled) for filled in range(11))
 
 
 class Loader:
     """
     Асинхронный менеджер контекста с прогресс-баром загрузки.
     Использует асимптотическое приближение к 99%, пока не завершится блок with.
+
+    animate=False — без фоновой анимации: сообщение меняется только через update(),
+    для хендлеров, которые сами сообщают реальный прогресс.
     """
 
-    def __init__(self, message: Message, text: str = "⏳ Загружаю данные..."):
+    def __init__(self, message: Message, text: str = "⏳ Загружаю данные...", animate: bool = True):
         self.message = message
         self.text = text
+        self.animate = animate
         self.msg: Message | None = None
         self._task: asyncio.Task | None = None
+        self._done = asyncio.Event()
+        self._last_text: str | None = None
         self.progress: float = 0.0
 
     async def __aenter__(self):
-        self.msg = await self.message.answer(self._build_text(), parse_mode="HTML")
-        self._task = asyncio.create_task(self._animate())
+        self._last_text = self._build_text()
+        self.msg = await self.message.answer(self._last_text, parse_mode="HTML")
+        if self.animate:
+            self._task = asyncio.create_task(self._animate())
         return self
 
     def _build_text(self) -> str:
         """Формирует текст сообщения с прогресс-баром."""
-        # Рисуем 10 блоков (каждый = 10%)
-        filled_blocks = int(self.progress / 10)
-        empty_blocks = 10 - filled_blocks
+        return f"{self.text}\n\n<code>[{_BARS[int(self.progress / 10)]}] {int(self.progress)}%</code>"
+
+    def _advance(self) -> None:
+        # Математика фейкового прогресса:
+        # На каждом шаге проходим 35% от оставшегося пути до 100%.
+        # Это дает быстрый старт и замедление в конце.
+        remaining = 100.0 - self.progress
+        step = remaining * 0.35
+
+        # Защита от слишком мелких шагов
+        if step < 1.0 and self.progress < 99:
+            step = 1.0
 
-        # Символы прогресс-бара
-        bar = "█" * filled_blocks + "░" * empty_blocks
+        self.progress += step
 
-        return f"{self.text}\n\n<code>[{bar}] {int(self.progress)}%</code>"
+        # Замираем на 99%, ждем пока вычисления не закончатся
+        if self.progress > 99:
+            self.progress = 99.0
 
     async def _animate(self):
-        # Telegram API не любит частые изменения (ошибка FloodWait),
-        # поэтому обновляем статус раз в 1.2 секунды.
+        # Telegram API не любит частые изменения (ошибка FloodWait), поэтому первый тик
+        # через 0.8 с, дальше интервал растёт в 1.3 раза (до 3 с). Если блок with закончился
+        # раньше тика — выходим сразу, без лишнего edit_text.
+        interval = ANIMATE_FIRST_INTERVAL
         while self.progress < 99:
             try:
-                await asyncio.sleep(1.2)
-
-                # Математика фейкового прогресса:
-                # На каждом шаге проходим 35% от оставшегося пути до 100%.
-                # Это дает быстрый старт и замедление в конце.
-                remaining = 100.0 - self.progress
-                step = remaining * 0.35
-
-                # Защита от слишком мелких шагов
-                if step < 1.0 and self.progress < 99:
-                    step = 1.0
-
-                self.progress += step
-
-                # Замираем на 99%, ждем пока вычисления не закончатся
-                if self.progress > 99:
-                    self.progress = 99.0
-
-                if self.msg:
-                    await self.msg.edit_text(self._build_text(), parse_mode="HTML")
+                try:
+                    await asyncio.wait_for(self._done.wait(), timeout=interval)
+                    break
+                except asyncio.TimeoutError:
+                    pass
+                interval = min(interval * ANIMATE_BACKOFF, ANIMATE_MAX_INTERVAL)
+
+                self._advance()
+                if not await self._safe_edit():
+                    # Неожиданная ошибка уже залогирована — не крутим анимацию дальше
+                    break
 
             except asyncio.CancelledError:
                 # Задача отменена при выходе из контекстного менеджера
                 break
-            except TelegramBadRequest:
-                # Игнорируем ошибку, если текст не изменился
-                pass
-            except Exception:
-                pass
 
     async def update(self, new_text: str):
         """Позволяет обновить текст лоадера и подстегнуть прогресс."""
@@ -74,14 +92,33 @@ class Loader:
         if self.progress < 50:
             self.progress += 20
 
-        if self.msg:
-            try:
-                await self.msg.edit_text(self._build_text(), parse_mode="HTML")
-            except Exception:
-                pass
+        await self._safe_edit()
+
+    async def _edit(self) -> None:
+        """Редактирует сообщение, только если текст действительно изменился (экономим запрос к API)."""
+        new_text = self._build_text()
+        if not self.msg or new_text == self._last_text:
+            return
+        await self.msg.edit_text(new_text, parse_mode="HTML")
+        self._last_text = new_text
+
+    async def _safe_edit(self) -> bool:
+        """
+        _edit без падения хендлера. Ошибки Telegram (FloodWait, сеть, «message is not modified»)
+        просто пропускают кадр; остальное логируем. False — только при неожиданной ошибке.
+        """
+        try:
+            await self._edit()
+        except TelegramAPIError:
+            pass
+        except Exception:
+            logger.exception("Unexpected error while updating loader message")
+            return False
+        return True
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         # Останавливаем анимацию
+        self._done.set()
         if self._task:
             self._task.cancel()
 
@@ -89,5 +126,6 @@ class Loader:
         if self.msg:
             try:
                 await self.msg.delete()
-            except Exception:
+            except TelegramAPIError:
+                # Сообщение уже удалено или Telegram недоступен — не мешаем основному ответу
                 pass
\ No newline at end of file
@@ -1,5 +1,7 @@
 import asyncio
+import functools
 import logging
+import time
 from datetime import datetime, timezone, timedelta
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
@@ -24,7 +26,8 @@ from app.db import (
     get_driver_vote_winner,
     get_all_group_chats,
     was_reminder_sent,
-    set_reminder_sent,
+    set_reminders_sent,
+    disable_notifications_for,
 )
 import pandas as pd
 
@@ -40,7 +43,7 @@ from app.f1_data import (
     get_driver_full_name_async,
     set_cached_quali_results,
 )
-from app.utils.safe_send import safe_send_message, safe_send_photo
+from app.utils.safe_send import SharedPhoto, broadcast, pop_blocked_chats, safe_send_message, safe_send_photo
 from app.utils.image_render import create_f1_style_classification_image
 
 logger = logging.getLogger(__name__)
@@ -55,21 +58,74 @@ QUIET_END_HOUR = 10
 GROUP_NOTIFY_BEFORE = 60
 GROUP_TIMEZONE = "UTC"
 
+@functools.lru_cache(maxsize=1024)
+def _parse_utc(raw: str | None) -> datetime | None:
+    """
+    ISO-время из расписания → aware datetime (без таймзоны считаем UTC), None если пусто/битое.
+    Расписание опрашивается каждую минуту одними и теми же строками, поэтому разбор кэшируется.
+    """
+    if not raw:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(raw).replace("Z", "+00:00"))
+    except (TypeError, ValueError):
+        return None
+    return dt if dt.tzinfo is not None else dt.replace(tzinfo=timezone.utc)
+
+
+# Все задания планировщика читают одно и то же расписание: держим его SCHEDULE_CACHE_TTL
+# секунд, чтобы напоминания (каждые 30 с), результаты и голосование не разбирали его заново
+SCHEDULE_CACHE_TTL = 60.0
+_schedule_cache: dict[int, tuple[float, list[dict]]] = {}
+
+
+async def _get_schedule(season: int) -> list[dict]:
+    cached = _schedule_cache.get(season)
+    if cached is not None and time.monotonic() - cached[0] < SCHEDULE_CACHE_TTL:
+        return cached[1]
+    schedule = await get_season_schedule_short_async(season)
+    if schedule:
+        _schedule_cache[season] = (time.monotonic(), schedule)
+    return schedule
+
+
+@functools.lru_cache(maxsize=256)
+def _zone(tz_name: str) -> ZoneInfo | None:
+    """ZoneInfo по имени (один объект на таймзону), None для неизвестной/битой таймзоны."""
+    try:
+        return ZoneInfo(tz_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
 
 def is_quiet_hours(tz_name: str) -> bool:
     """
     Возвращает True, если сейчас 21:00–10:00 в таймзоне пользователя.
     В этот период уведомления отправляются с disable_notification=True (тихий режим).
     """
-    try:
-        tz = ZoneInfo(tz_name)
-    except ZoneInfoNotFoundError:
-        tz = ZoneInfo("Europe/Moscow")
-    now = datetime.now(tz)
-    hour = now.hour
-    if QUIET_START_HOUR <= hour or hour < QUIET_END_HOUR:
-        return True
-    return False
+    # Ответ зависит только от таймзоны и текущей минуты: рассылка на тысячи пользователей
+    # в нескольких таймзонах считает его несколько раз, а не на каждое сообщение
+    return _is_quiet_at(tz_name, int(time.time() // 60))
+
+
+@functools.lru_cache(maxsize=512)
+def _is_quiet_at(tz_name: str, _minute: int) -> bool:
+    tz = _zone(tz_name) or _zone("Europe/Moscow")
+    hour = datetime.now(tz).hour
+    return QUIET_START_HOUR <= hour or hour < QUIET_END_HOUR
+
+
+def _quiet_by_user(users) -> dict[int, bool]:
+    """telegram_id -> тихий режим; флаг считается один раз на таймзону."""
+    quiet_by_tz: dict[str, bool] = {}
+    quiet_map: dict[int, bool] = {}
+    for user in users or []:
+        tz = user[1] or "Europe/Moscow"
+        quiet = quiet_by_tz.get(tz)
+        if quiet is None:
+            quiet = quiet_by_tz[tz] = is_quiet_hours(tz)
+        quiet_map[user[0]] = quiet
+    return quiet_map
 
 
 def format_time_left(minutes_left: int) -> str:
@@ -104,8 +160,12 @@ def get_notification_text(
     for_quali: bool = False,
     event_kind: str | None = None,
     for_group: bool = False,
+    start_utc: datetime | None = None,
 ) -> str:
-    """Генерирует текст для ГОНКИ/КВАЛИ/СПРИНТА/СПРИНТ-КВАЛЫ. for_group=True — без строки «Начало в HH:MM»."""
+    """
+    Генерирует текст для ГОНКИ/КВАЛИ/СПРИНТА/СПРИНТ-КВАЛЫ. for_group=True — без строки «Начало в HH:MM».
+    start_utc — уже разобранное время старта (чтобы не разбирать строку заново для каждого пользователя).
+    """
     if event_kind is None:
         event_kind = "quali" if for_quali else "race"
     event_name = race.get('event_name', 'Гран-при')
@@ -115,16 +175,16 @@ def get_notification_text(
         "sprint": "sprint_start_utc",
         "sprint_quali": "sprint_quali_start_utc",
     }
-    dt_key = dt_key_map.get(event_kind, "race_start_utc")
-    dt_str = race.get(dt_key) or race.get("race_start_utc")
-    try:
-        dt_utc = datetime.fromisoformat(dt_str)
-        if dt_utc.tzinfo is None: dt_utc = dt_utc.replace(tzinfo=timezone.utc)
-        user_tz = ZoneInfo(user_tz_name)
+    dt_utc = start_utc
+    if dt_utc is None:
+        dt_key = dt_key_map.get(event_kind, "race_start_utc")
+        dt_utc = _parse_utc(race.get(dt_key) or race.get("race_start_utc"))
+    user_tz = _zone(user_tz_name)
+    if dt_utc is not None and user_tz is not None:
         local_dt = dt_utc.astimezone(user_tz)
         start_time_str = local_dt.strftime("%H:%M")
         start_date_str = local_dt.strftime("%d.%m.%Y")
-    except Exception:
+    else:
         start_time_str = "??:??"
         start_date_str = "??.??.????"
 
@@ -164,8 +224,46 @@ def get_notification_text(
     )
 
 
+# Настройки и избранное пользователей меняются редко, а читаются каждым заданием планировщика
+# (и каждой сессией уикенда подряд): держим выборки USERS_CACHE_TTL секунд
+USERS_CACHE_TTL = 30.0
+_users_cache: dict[bool, tuple[float, list[tuple]]] = {}
+_favorites_cache: tuple[float, dict] | None = None
+
+
+def invalidate_users_cache() -> None:
+    """Сбрасывает кэши настроек и избранного (после их изменения в боте)."""
+    global _favorites_cache
+    _users_cache.clear()
+    _favorites_cache = None
+
+
+async def _disable_blocked_users() -> None:
+    """После рассылки одним запросом выключает уведомления тем, кто заблокировал бота."""
+    # Отрицательные chat_id — группы, у них нет записи в users
+    blocked = {chat_id for chat_id in pop_blocked_chats() if chat_id > 0}
+    if not blocked:
+        return
+    await disable_notifications_for(blocked)
+    invalidate_users_cache()
+    logger.info("Disabled notifications for %s users who blocked the bot.", len(blocked))
+
+
+async def _get_users_favorites() -> dict:
+    """get_users_favorites_for_notifications с коротким кэшем."""
+    global _favorites_cache
+    if _favorites_cache is not None and time.monotonic() - _favorites_cache[0] < USERS_CACHE_TTL:
+        return _favorites_cache[1]
+    favorites = await get_users_favorites_for_notifications()
+    _favorites_cache = (time.monotonic(), favorites)
+    return favorites
+
+
 async def get_users_with_settings(notifications_only: bool = False):
     """Возвращает (telegram_id, timezone, notify_before[, notifications_enabled])."""
+    cached = _users_cache.get(notifications_only)
+    if cached is not None and time.monotonic() - cached[0] < USERS_CACHE_TTL:
+        return cached[1]
     if not db.conn: await db.connect()
     try:
         q = (
@@ -176,131 +274,160 @@ async def get_users_with_settings(notifications_only: bool = False):
             q += " AND notifications_enabled = 1"
         async with db.conn.execute(q) as cursor:
             rows = await cursor.fetchall()
-            return [(r[0], r[1], r[2], r[3] if len(r) > 3 else False) for r in rows]
+            users = [tuple(r) for r in rows]
     except Exception as e:
         logger.error(f"Error fetching settings: {e}")
         return []
+    _users_cache[notifications_only] = (time.monotonic(), users)
+    return users
 
 
 # --- ЗАДАЧА 1: АНОНСЫ (ГОНКИ И ТЕСТЫ) ---
 
+_REMINDER_EVENTS = (
+    ("race_start_utc", "race"),
+    ("quali_start_utc", "quali"),
+    ("sprint_start_utc", "sprint"),
+    ("sprint_quali_start_utc", "sprint_quali"),
+)
+
+# Максимальное «за сколько до старта» в настройках напоминаний, минуты
+REMINDER_HORIZON_MIN = 30 * 60
+
+
 async def check_and_send_notifications(bot: Bot):
-    season = datetime.now(timezone.utc).year
-    schedule = await get_season_schedule_short_async(season)
+    now = datetime.now(timezone.utc)
+    season = now.year
+    schedule = await _get_schedule(season)
     if not schedule: return
 
-    now = datetime.now(timezone.utc)
-    upcoming_event = []  # (race_dict, minutes_left, event_kind)
+    upcoming_event = []  # (race_dict, minutes_left, event_kind, start_dt)
 
     for r in schedule:
-        # Напоминание перед ГОНКОЙ
-        if r.get("race_start_utc"):
-            try:
-                race_dt = datetime.fromisoformat(r["race_start_utc"])
-                if race_dt.tzinfo is None: race_dt = race_dt.replace(tzinfo=timezone.utc)
-                minutes_left = (race_dt - now).total_seconds() / 60
-                if 0 < minutes_left <= 30 * 60:
-                    upcoming_event.append((r, minutes_left, "race"))
-            except Exception:
-                pass
-        # Напоминание перед КВАЛИФИКАЦИЕЙ
-        if r.get("quali_start_utc") and not r.get("is_testing"):
-            try:
-                quali_dt = datetime.fromisoformat(r["quali_start_utc"])
-                if quali_dt.tzinfo is None: quali_dt = quali_dt.replace(tzinfo=timezone.utc)
-                minutes_left = (quali_dt - now).total_seconds() / 60
-                if 0 < minutes_left <= 30 * 60:
-                    upcoming_event.append((r, minutes_left, "quali"))
-            except Exception:
-                pass
-        # Напоминание перед СПРИНТОМ
-        if r.get("sprint_start_utc") and not r.get("is_testing"):
-            try:
-                sprint_dt = datetime.fromisoformat(r["sprint_start_utc"])
-                if sprint_dt.tzinfo is None: sprint_dt = sprint_dt.replace(tzinfo=timezone.utc)
-                minutes_left = (sprint_dt - now).total_seconds() / 60
-                if 0 < minutes_left <= 30 * 60:
-                    upcoming_event.append((r, minutes_left, "sprint"))
-            except Exception:
-                pass
-        # Напоминание перед СПРИНТ-КВАЛИФИКАЦИЕЙ
-        if r.get("sprint_quali_start_utc") and not r.get("is_testing"):
-            try:
-                sprint_q_dt = datetime.fromisoformat(r["sprint_quali_start_utc"])
-                if sprint_q_dt.tzinfo is None: sprint_q_dt = sprint_q_dt.replace(tzinfo=timezone.utc)
-                minutes_left = (sprint_q_dt - now).total_seconds() / 60
-                if 0 < minutes_left <= 30 * 60:
-                    upcoming_event.append((r, minutes_left, "sprint_quali"))
-            except Exception:
-                pass
+        earliest_left = None
+        # Гонка (и тесты), квалификация, спринт, спринт-квалификация — в этом порядке
+        for dt_key, event_kind in _REMINDER_EVENTS:
+            if event_kind != "race" and r.get("is_testing"):
+                continue
+            start_dt = _parse_utc(r.get(dt_key))
+            if start_dt is None:
+                continue
+            minutes_left = (start_dt - now).total_seconds() / 60
+            if earliest_left is None or minutes_left < earliest_left:
+                earliest_left = minutes_left
+            # Окно напоминаний: (0; 30 ч] — прошедшие сессии и дальние этапы не берём
+            if 0 < minutes_left <= REMINDER_HORIZON_MIN:
+                upcoming_event.append((r, minutes_left, event_kind, start_dt))
+        # Расписание упорядочено по этапам: если даже первая сессия этапа дальше окна,
+        # все следующие этапы тоже вне окна
+        if earliest_left is not None and earliest_left > REMINDER_HORIZON_MIN:
+            break
 
     if not upcoming_event:
         return
 
     users = await get_users_with_settings(notifications_only=True)
-    group_chats = await get_all_group_chats()
+    group_chats = list(dict.fromkeys(await get_all_group_chats() or []))
     if not users and not group_chats:
         return
 
     # Окно ±1 мин от целевого времени, чтобы не слать «за 32 мин» вместо «за 30»
     half_window = 1.0
 
-    sent_count = 0
-    for user in users:
-        try:
-            tg_id = user[0]
-            tz = user[1] or "Europe/Moscow"
-            notify_min = user[2] or 1440
-
-            for race, mins, event_kind in upcoming_event:
-                if abs(mins - notify_min) <= half_window:
-                    round_num = race.get("round")
-                    is_quali_key, notify_key = _event_reminder_key(event_kind, notify_min)
-                    if round_num is not None:
-                        if await was_reminder_sent(tg_id, season, round_num, is_quali_key, notify_key):
-                            continue
-
-                    if race.get("is_testing"):
-                        text = (
-                            f"🧪 Предсезонные тесты!\n\n"
-                            f"Уже завтра: {race.get('event_name')}\n"
-                            f"📍 Трасса: {race.get('location')}\n"
-                            f"Не забудьте следить за результатами!"
-                        )
-                    else:
-                        text = get_notification_text(race, tz, mins, event_kind=event_kind)
-
-                    quiet = is_quiet_hours(tz)
-                    if await safe_send_message(bot, tg_id, text, disable_notification=quiet):
-                        sent_count += 1
-                        if round_num is not None:
-                            await set_reminder_sent(tg_id, season, round_num, is_quali_key, notify_key)
-                    await asyncio.sleep(0.05)
-        except Exception:
-            continue
+    # Отметки «напоминание отправлено» копим и пишем одним commit после рассылки
+    sent_marks: list[tuple[int, int, int, bool, int]] = []
+
+    # Таймзон у пользователей мало (в основном Europe/Moscow): текст считаем один раз
+    # на (событие, таймзона)
+    texts: dict[tuple[int, str], str] = {}
+
+    # У каждого пользователя один notify_before, а различных значений всего несколько:
+    # подходящие события ищем один раз на значение, а не для каждого пользователя
+    due_by_notify: dict[int, list[tuple[int, tuple]]] = {}
+    for notify_min in {u[2] or 1440 for u in users or []}:
+        due = [
+            (event_idx, event)
+            for event_idx, event in enumerate(upcoming_event)
+            if abs(event[1] - notify_min) <= half_window
+        ]
+        if due:
+            due_by_notify[notify_min] = due
+    due_users = [u for u in users or [] if (u[2] or 1440) in due_by_notify]
+    group_due = [
+        event for event in upcoming_event
+        if abs(event[1] - GROUP_NOTIFY_BEFORE) <= half_window
+    ] if group_chats else []
+    # Ни у кого не совпало «за сколько до старта» — пользователей и группы не перебираем
+    if not due_users and not group_due:
+        return
+
+    async def _notify_user(user) -> int:
+        tg_id = user[0]
+        tz = user[1] or "Europe/Moscow"
+        notify_min = user[2] or 1440
+
+        sent = 0
+        for event_idx, (race, mins, event_kind, start_dt) in due_by_notify[notify_min]:
+            round_num = race.get("round")
+            is_quali_key, notify_key = _event_reminder_key(event_kind, notify_min)
+            if round_num is not None:
+                if await was_reminder_sent(tg_id, season, round_num, is_quali_key, notify_key):
+                    continue
+
+            text = texts.get((event_idx, tz))
+            if text is None:
+                if race.get("is_testing"):
+                    text = (
+                        f"🧪 Предсезонные тесты!\n\n"
+                        f"Уже завтра: {race.get('event_name')}\n"
+                        f"📍 Трасса: {race.get('location')}\n"
+                        f"Не забудьте следить за результатами!"
+                    )
+                else:
+                    text = get_notification_text(race, tz, mins, event_kind=event_kind, start_utc=start_dt)
+                texts[(event_idx, tz)] = text
+
+            quiet = is_quiet_hours(tz)
+            if await safe_send_message(bot, tg_id, text, disable_notification=quiet):
+                sent += 1
+                if round_num is not None:
+                    sent_marks.append((tg_id, season, round_num, is_quali_key, notify_key))
+        return sent
+
+    try:
+        sent_count = await broadcast(due_users, _notify_user)
+    finally:
+        await set_reminders_sent(sent_marks)
 
     # === Рассылка в группы (общая информация, без избранного) — один раз на группу ===
-    group_chats_raw = await get_all_group_chats()
-    group_chats = list(dict.fromkeys(group_chats_raw)) if group_chats_raw else []
-    if group_chats:
-        for race, mins, event_kind in upcoming_event:
-            if abs(mins - GROUP_NOTIFY_BEFORE) <= half_window:
-                round_num_g = race.get("round")
-                is_quali_key, notify_key = _event_reminder_key(event_kind, GROUP_NOTIFY_BEFORE)
-                text = get_notification_text(race, GROUP_TIMEZONE, mins, event_kind=event_kind, for_group=True)
-                quiet = is_quiet_hours(GROUP_TIMEZONE)
-                for chat_id in group_chats:
-                    group_key = None
-                    if round_num_g is not None:
-                        group_key = -abs(int(chat_id))
-                        if await was_reminder_sent(group_key, season, round_num_g, is_quali_key, notify_key):
-                            continue
-                    if await safe_send_message(bot, chat_id, text, parse_mode="HTML", disable_notification=quiet):
-                        sent_count += 1
-                        if group_key is not None:
-                            await set_reminder_sent(group_key, season, round_num_g, is_quali_key, notify_key)
-                    await asyncio.sleep(0.05)
+    for race, mins, event_kind, start_dt in group_due:
+        round_num_g = race.get("round")
+        is_quali_key, notify_key = _event_reminder_key(event_kind, GROUP_NOTIFY_BEFORE)
+        text = get_notification_text(
+            race, GROUP_TIMEZONE, mins, event_kind=event_kind, for_group=True, start_utc=start_dt
+        )
+        quiet = is_quiet_hours(GROUP_TIMEZONE)
+        group_marks: list[tuple[int, int, int, bool, int]] = []
+
+        async def _notify_group(chat_id, round_num_g=round_num_g, is_quali_key=is_quali_key,
+                                notify_key=notify_key, text=text, quiet=quiet, marks=group_marks) -> bool:
+            group_key = None
+            if round_num_g is not None:
+                group_key = -abs(int(chat_id))
+                if await was_reminder_sent(group_key, season, round_num_g, is_quali_key, notify_key):
+                    return False
+            if await safe_send_message(bot, chat_id, text, disable_notification=quiet):
+                if group_key is not None:
+                    marks.append((group_key, season, round_num_g, is_quali_key, notify_key))
+                return True
+            return False
 
+        try:
+            sent_count += await broadcast(group_chats, _notify_group)
+        finally:
+            await set_reminders_sent(group_marks)
+
+    await _disable_blocked_users()
     if sent_count > 0:
         logger.info(f"✅ Sent {sent_count} event reminders.")
 
@@ -309,16 +436,21 @@ async def check_and_send_notifications(bot: Bot):
 
 RACE_RESULTS_MIN_ROWS = 10
 
+# Подиум в подписях по избранному; остальные позиции — просто «P{pos}»
+_PODIUM_LABELS = {"1": "🥇 P1", "2": "🥈 P2", "3": "🥉 P3"}
+_MEDALS = ("🥇", "🥈", "🥉")
+
+
+def _driver_result_line(item: dict) -> str:
+    pos = item['pos']
+    pos_str = _PODIUM_LABELS.get(str(pos)) or f"P{pos}"
+    return f"{item['code']}: {pos_str} (+{item.get('points', 0)})"
+
+
 def build_results_text(race_name: str, favorites_results: list[dict]) -> str:
     """Текст по избранным пилотам (для тестовых команд)."""
-    lines = []
-    for item in favorites_results:
-        pos_str = f"P{item['pos']}"
-        if str(item.get('pos')) == '1': pos_str = "🥇 P1"
-        elif str(item.get('pos')) == '2': pos_str = "🥈 P2"
-        elif str(item.get('pos')) == '3': pos_str = "🥉 P3"
-        lines.append(f"{item['code']}: {pos_str} (+{item.get('points', 0)})")
-    return f"🏁 Финиш: {race_name}\n\nВаши фавориты:\n" + "\n".join(lines)
+    lines = "\n".join(map(_driver_result_line, favorites_results))
+    return f"🏁 Финиш: {race_name}\n\nВаши фавориты:\n" + lines
 
 
 def build_favorites_caption(
@@ -333,19 +465,10 @@ def build_favorites_caption(
     """
     parts = []
     if driver_results:
-        lines = []
-        for item in driver_results:
-            pos_str = f"P{item['pos']}"
-            if str(item.get('pos')) == '1': pos_str = "🥇 P1"
-            elif str(item.get('pos')) == '2': pos_str = "🥈 P2"
-            elif str(item.get('pos')) == '3': pos_str = "🥉 P3"
-            lines.append(f"{item['code']}: {pos_str} (+{item.get('points', 0)})")
-        parts.append("<b>🏎 Пилоты</b>\n" + "\n".join(lines))
+        parts.append("<b>🏎 Пилоты</b>\n" + "\n".join(map(_driver_result_line, driver_results)))
     if team_results:
-        lines = []
-        for t in team_results:
-            lines.append(f"• {t.get('team', '?')}: {t.get('text', '')}")
-        parts.append("<b>🏁 Команды</b>\n" + "\n".join(lines))
+        lines = "\n".join(f"• {t.get('team', '?')}: {t.get('text', '')}" for t in team_results)
+        parts.append("<b>🏁 Команды</b>\n" + lines)
     if not parts:
         return f"🏁 {event_name}\n\n📊 Результаты на картинке."
     inner = "\n\n".join(parts)
@@ -378,7 +501,7 @@ def _format_session_value(value) -> str:
             minutes = int((seconds % 3600) // 60)
             remainder = seconds % 60
             return f"{hours}:{minutes:02d}:{remainder:06.3f}" if hours else f"{minutes}:{remainder:06.3f}"
-    except Exception:
+    except (TypeError, ValueError):
         pass
     text = str(value).strip()
     return text if text and text.lower() not in {"nan", "nat"} else "—"
@@ -399,21 +522,14 @@ def _latest_finished_session(
     schedule: list[dict],
     datetime_key: str,
     elapsed_minutes: int,
+    now: datetime | None = None,
 ) -> dict | None:
-    now = datetime.now(timezone.utc)
+    now = now or datetime.now(timezone.utc)
     finished = None
     for event in schedule or []:
-        raw = event.get(datetime_key)
-        if not raw:
-            continue
-        try:
-            started = datetime.fromisoformat(raw)
-            if started.tzinfo is None:
-                started = started.replace(tzinfo=timezone.utc)
-            if now >= started + timedelta(minutes=elapsed_minutes):
-                finished = event
-        except (TypeError, ValueError):
-            continue
+        started = _parse_utc(event.get(datetime_key))
+        if started is not None and now >= started + timedelta(minutes=elapsed_minutes):
+            finished = event
     return finished
 
 
@@ -443,7 +559,7 @@ def _normalize_sprint_results(results_df: pd.DataFrame, code_to_team: dict[str,
     rows = []
     if results_df is None or results_df.empty:
         return rows
-    for _, result in results_df.head(22).iterrows():
+    for result in results_df.head(22).to_dict("records"):
         try:
             position = int(result.get("Position"))
         except (TypeError, ValueError):
@@ -471,6 +587,24 @@ def _normalize_sprint_results(results_df: pd.DataFrame, code_to_team: dict[str,
     return sorted(rows, key=lambda row: row["position"])
 
 
+def _column_values(df: pd.DataFrame, column: str, default) -> list:
+    """Значения колонки обычным списком (без построчного getattr); если колонки нет — default."""
+    if column in df.columns:
+        return df[column].tolist()
+    return [default] * len(df)
+
+
+def _position_int(value) -> int | None:
+    """
+    Позиция из результатов: 1, 1.0 (FastF1 отдаёт float) или "1" → int.
+    Статусы вместо позиции ("R", "DNF", "?"), NaN и пустое → None, без исключений.
+    """
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    text = str(value).strip()
+    return int(text) if text.isdigit() else None
+
+
 def _team_matches(favorite: str, actual: str) -> bool:
     fav = str(favorite or "").strip().lower()
     team = str(actual or "").strip().lower()
@@ -518,14 +652,15 @@ async def _load_code_to_team(season: int, round_num: int) -> dict[str, str]:
     except Exception:
         logger.exception("Failed to load driver standings for session notification")
         return {}
-    mapping = {}
-    if not standings.empty and "driverCode" in standings.columns:
-        for row in standings.itertuples(index=False):
-            code = str(getattr(row, "driverCode", "") or "").strip().upper()
-            team = str(getattr(row, "constructorName", "") or "").strip()
-            if code:
-                mapping[code] = team
-    return mapping
+    if standings.empty or "driverCode" not in standings.columns:
+        return {}
+    # Колонками целиком, без namedtuple и getattr на каждую строку
+    codes = standings["driverCode"].fillna("").astype(str).str.strip().str.upper()
+    if "constructorName" in standings.columns:
+        teams = standings["constructorName"].fillna("").astype(str).str.strip()
+    else:
+        teams = [""] * len(standings)
+    return {code: team for code, team in zip(codes, teams) if code}
 
 
 async def _deliver_session_classification(
@@ -542,9 +677,12 @@ async def _deliver_session_classification(
         logger.warning("%s round %s is incomplete: %s rows", session_label, round_num, len(rows))
         return False
 
-    users_favorites = await get_users_favorites_for_notifications()
-    group_chats = list(dict.fromkeys(await get_all_group_chats() or []))
-    notification_users = await get_users_with_settings(notifications_only=True)
+    users_favorites, group_chats_raw, notification_users = await asyncio.gather(
+        _get_users_favorites(),
+        get_all_group_chats(),
+        get_users_with_settings(notifications_only=True),
+    )
+    group_chats = list(dict.fromkeys(group_chats_raw or []))
     if not notification_users:
         notification_users = await get_users_with_settings(notifications_only=False)
     if not users_favorites and not group_chats and not notification_users:
@@ -568,102 +706,127 @@ async def _deliver_session_classification(
             favorite_driver_codes=None,
         )
 
-    photo_bytes = (await asyncio.to_thread(_render)).getvalue()
-    sent_count = 0
-    all_succeeded = True
-    recipient_ids = set()
-    for user in notification_users:
-        tg_id, tz = user[0], user[1] or "Europe/Moscow"
-        recipient_ids.add(tg_id)
-        delivered = await safe_send_photo(
+    session_photo = SharedPhoto((await asyncio.to_thread(_render)).getvalue())
+    recipients = [(user[0], user[1] or "Europe/Moscow") for user in notification_users]
+    recipient_ids = {tg_id for tg_id, _ in recipients}
+
+    async def _send_photo(recipient) -> bool:
+        tg_id, tz = recipient
+        return await safe_send_photo(
             bot,
             tg_id,
-            photo_bytes,
+            session_photo,
             caption=f"🏁 {session_label}: результаты на картинке.",
-            parse_mode="HTML",
             has_spoiler=True,
             disable_notification=is_quiet_hours(tz),
         )
-        sent_count += int(delivered)
-        all_succeeded = all_succeeded and delivered
-        await asyncio.sleep(0.05)
 
-    settings = await get_users_with_settings()
-    tz_map = {user[0]: (user[1] or "Europe/Moscow") for user in settings}
+    sent_count = await broadcast(recipients, _send_photo)
+    attempted = len(recipients)
+
+    favorites_texts: dict[tuple[tuple[str, ...], tuple[str, ...]], str] = {}
+    favorites_messages: list[tuple[int, str]] = []
     for tg_id, favorites in users_favorites.items():
         if recipient_ids and tg_id not in recipient_ids:
             continue
-        text = _build_session_favorites_text(
-            event_name,
-            session_label,
-            rows,
-            favorites.get("drivers", []),
-            favorites.get("teams", []),
-        )
-        if not text:
+        fav_key = (tuple(favorites.get("drivers", [])), tuple(favorites.get("teams", [])))
+        if not fav_key[0] and not fav_key[1]:
             continue
-        delivered = await safe_send_message(
+        if fav_key not in favorites_texts:
+            favorites_texts[fav_key] = _build_session_favorites_text(
+                event_name,
+                session_label,
+                rows,
+                list(fav_key[0]),
+                list(fav_key[1]),
+            )
+        text = favorites_texts[fav_key]
+        if text:
+            favorites_messages.append((tg_id, text))
+
+    # Тихий режим всех пользователей нужен только для сообщений по избранному
+    quiet_map: dict[int, bool] = {}
+    if favorites_messages:
+        quiet_map = _quiet_by_user(await get_users_with_settings())
+    default_quiet = is_quiet_hours("Europe/Moscow")
+
+    async def _send_favorites(message) -> bool:
+        tg_id, text = message
+        return await safe_send_message(
             bot,
             tg_id,
             text,
-            parse_mode="HTML",
-            disable_notification=is_quiet_hours(tz_map.get(tg_id, "Europe/Moscow")),
+            disable_notification=quiet_map.get(tg_id, default_quiet),
         )
-        sent_count += int(delivered)
-        all_succeeded = all_succeeded and delivered
-        await asyncio.sleep(0.05)
+
+    sent_count += await broadcast(favorites_messages, _send_favorites)
+    attempted += len(favorites_messages)
 
     group_caption = f"🏁 {session_label} — этап {round_num:02d}, сезон {season}\n\n📊 Результаты на картинке."
-    for chat_id in group_chats:
-        delivered = await safe_send_photo(
+
+    async def _send_group_photo(chat_id) -> bool:
+        return await safe_send_photo(
             bot,
             chat_id,
-            photo_bytes,
+            session_photo,
             caption=group_caption,
-            parse_mode="HTML",
             disable_notification=is_quiet_hours(GROUP_TIMEZONE),
         )
-        sent_count += int(delivered)
-        all_succeeded = all_succeeded and delivered
-        await asyncio.sleep(0.05)
 
-    return sent_count > 0 and all_succeeded
+    sent_count += await broadcast(group_chats, _send_group_photo)
+    attempted += len(group_chats)
+
+    return sent_count > 0 and sent_count == attempted
+
+
+# Когда все завершённые этапы уже разосланы, следующий результат появится не раньше
+# финиша следующей гонки: до этого момента (но не дольше RESULTS_IDLE_MAX) задача
+# не ходит ни в БД, ни за расписанием
+RESULTS_IDLE_MAX = timedelta(hours=1)
+_results_idle_until: dict[int, datetime] = {}
 
 
 async def check_and_send_results(bot: Bot):
-    season = datetime.now(timezone.utc).year
+    now = datetime.now(timezone.utc)
+    season = now.year
+    idle_until = _results_idle_until.get(season)
+    if idle_until is not None and now < idle_until:
+        return
+
     last_notified = await get_last_notified_round(season)
-    schedule = await get_season_schedule_short_async(season)
+    schedule = await _get_schedule(season)
 
     # Ищем последнюю завершенную
-    now = datetime.now(timezone.utc)
     finished_event = None
+    next_finish = None
 
     for r in schedule:
-        if not r.get("race_start_utc"): continue
-        try:
-            race_dt = datetime.fromisoformat(r["race_start_utc"])
-            if race_dt.tzinfo is None: race_dt = race_dt.replace(tzinfo=timezone.utc)
-            # Не читаем live-позиции как финальную классификацию: обычную гонку
-            # начинаем проверять не раньше чем через два часа после старта.
-            finish_offset = 9 if r.get("is_testing") else 2
-
-            if now > race_dt + timedelta(hours=finish_offset):
-                finished_event = r
-            else:
-                break
-        except:
+        # Уже разосланные этапы не разбираем: итог всё равно отсеется проверкой last_notified ниже
+        if last_notified and (r.get("round") or 0) <= last_notified:
             continue
+        race_dt = _parse_utc(r.get("race_start_utc"))
+        if race_dt is None:
+            continue
+        # Не читаем live-позиции как финальную классификацию: обычную гонку
+        # начинаем проверять не раньше чем через два часа после старта.
+        finish_offset = 9 if r.get("is_testing") else 2
 
-    if not finished_event: return
-    round_num = finished_event["round"]
+        if now > race_dt + timedelta(hours=finish_offset):
+            finished_event = r
+        else:
+            next_finish = race_dt + timedelta(hours=finish_offset)
+            break
 
-    if last_notified and last_notified >= round_num: return
+    if not finished_event or (last_notified and last_notified >= finished_event["round"]):
+        if next_finish is not None:
+            _results_idle_until[season] = min(next_finish, now + RESULTS_IDLE_MAX)
+        return
+    round_num = finished_event["round"]
 
     # === ЛОГИКА ДЛЯ ТЕСТОВ ===
     if finished_event.get("is_testing"):
         # Для тестов рассылаем ТОП-3 всем
-        logger.info(f"🧪 Checking testing results for {finished_event['event_name']}...")
+        logger.debug("🧪 Checking testing results for %s...", finished_event['event_name'])
         df, day_name = await get_testing_results_async(season, round_num)
 
         if df.empty: return
@@ -671,13 +834,13 @@ async def check_and_send_results(bot: Bot):
         # Формируем текст Топ-3
         top3 = df.head(3)
         lines = []
-        for i, row in top3.iterrows():
+        for i, row in zip(top3.index, top3.to_dict("records")):
             driver = row.get('Abbreviation', '???')
             time = str(row.get('Time', '-'))
             if "days" in time: time = time.split("days")[-1].strip()
             if "." in time: time = time[:-3]
 
-            medal = ["🥇", "🥈", "🥉"][i] if i < 3 else ""
+            medal = _MEDALS[i] if i < 3 else ""
             lines.append(f"{medal} {driver}: {time}")
 
         text = (
@@ -690,18 +853,18 @@ async def check_and_send_results(bot: Bot):
         # Рассылаем всем с включёнными уведомлениями + в группы
         users = await get_users_with_settings(notifications_only=True)
         group_chats = await get_all_group_chats()
-        sent_count = 0
-        for user in users:
-            tz = user[1] or "Europe/Moscow"
-            quiet = is_quiet_hours(tz)
-            if await safe_send_message(bot, user[0], text, disable_notification=quiet):
-                sent_count += 1
-            await asyncio.sleep(0.05)
-        for chat_id in group_chats:
-            if await safe_send_message(bot, chat_id, text, disable_notification=is_quiet_hours(GROUP_TIMEZONE)):
-                sent_count += 1
-            await asyncio.sleep(0.05)
+        sent_count = await broadcast(
+            users,
+            lambda user: safe_send_message(
+                bot, user[0], text, disable_notification=is_quiet_hours(user[1] or "Europe/Moscow")
+            ),
+        )
+        sent_count += await broadcast(
+            group_chats,
+            lambda chat_id: safe_send_message(bot, chat_id, text, disable_notification=is_quiet_hours(GROUP_TIMEZONE)),
+        )
 
+        await _disable_blocked_users()
         if sent_count > 0:
             await set_last_notified_round(season, round_num)
         else:
@@ -714,11 +877,14 @@ async def check_and_send_results(bot: Bot):
     # Проверяем, что данные полные (нет ??)
     data_incomplete = False
     if not results_df.empty:
-        for row in results_df.itertuples(index=False):
-            code = getattr(row, "Abbreviation", "") or getattr(row, "DriverNumber", "?")
-            given = getattr(row, "FirstName", "") or ""
-            family = getattr(row, "LastName", "") or ""
-            full = f"{given} {family}".strip() or code
+        for abbr, number, given, family in zip(
+            _column_values(results_df, "Abbreviation", ""),
+            _column_values(results_df, "DriverNumber", "?"),
+            _column_values(results_df, "FirstName", ""),
+            _column_values(results_df, "LastName", ""),
+        ):
+            code = abbr or number
+            full = f"{given or ''} {family or ''}".strip() or code
             if code == "?" or "?" in str(full):
                 data_incomplete = True
                 break
@@ -735,18 +901,25 @@ async def check_and_send_results(bot: Bot):
                 f"Оцените этап по 5-балльной шкале и выберите пилота дня — "
                 f"откройте раздел <b>Голосование</b> в MiniWebApp слева по кнопке."
             )
-            for u in voting_users:
-                tg_id, tz = u[0], u[1] or "Europe/Moscow"
-                quiet = is_quiet_hours(tz)
-                await safe_send_message(bot, tg_id, voting_text, parse_mode="HTML", disable_notification=quiet)
-                await asyncio.sleep(0.05)
+            await broadcast(
+                voting_users,
+                lambda u: safe_send_message(
+                    bot, u[0], voting_text,
+                    disable_notification=is_quiet_hours(u[1] or "Europe/Moscow"),
+                ),
+            )
             await set_last_notified_voting_invite_round(season, round_num)
             logger.info(f"🗳 Sent voting invite for {event_name} (no results yet)")
         return
 
-    users_favorites = await get_users_favorites_for_notifications()
-    group_chats = await get_all_group_chats()
-    notifications_users = await get_users_with_settings(notifications_only=True)
+    # Независимые запросы к БД выполняем параллельно; список с включёнными
+    # уведомлениями переиспользуем ниже для приглашения на голосование
+    users_favorites, group_chats, enabled_users = await asyncio.gather(
+        _get_users_favorites(),
+        get_all_group_chats(),
+        get_users_with_settings(notifications_only=True),
+    )
+    notifications_users = enabled_users
     if not notifications_users:
         # Legacy fallback: старые пользователи могли остаться с notifications_enabled=0 после миграции.
         notifications_users = await get_users_with_settings(notifications_only=False)
@@ -754,85 +927,81 @@ async def check_and_send_results(bot: Bot):
         await set_last_notified_round(season, round_num)
         return
 
-    users_settings = await get_users_with_settings()
-    tz_map = {u[0]: (u[1] or "Europe/Moscow") for u in users_settings}
-
     # Картинка с общими результатами (без звёздочек для избранных — одна картинка на всех)
     race_info = finished_event
     if "Position" in results_df.columns:
-        results_df = results_df.sort_values("Position")
+        # Статусы вместо позиции ("R", "DNF") не должны ронять сортировку — уходят в конец, как NaN
+        results_df = results_df.sort_values("Position", key=lambda col: pd.to_numeric(col, errors="coerce"))
 
-    try:
-        driver_standings = await get_driver_standings_async(season, round_number=round_num)
-    except Exception:
-        logger.exception("Failed to load driver standings while preparing race notification")
-        driver_standings = pd.DataFrame()
+    # Standings нужны только как запасной источник команды: если TeamName есть
+    # у всех строк таблицы, лишний запрос к Jolpica/FastF1 не делаем
     code_to_team: dict[str, str] = {}
-    if not driver_standings.empty and "driverCode" in driver_standings.columns:
-        for row in driver_standings.itertuples(index=False):
-            c = str(getattr(row, "driverCode", "") or "").strip().upper()
-            team = str(getattr(row, "constructorName", "") or "").strip()
-            if c:
-                code_to_team[c] = team
+    if any(not team for team in _column_values(results_df.head(22), "TeamName", "")):
+        code_to_team = await _load_code_to_team(season, round_num)
 
+    # Время всех пилотов — одной векторной конвертацией; битые значения становятся NaN
     min_time_sec: float | None = None
-    time_secs: list[float] = []
     has_time = "Time" in results_df.columns
     if has_time:
-        for _, row in results_df.iterrows():
-            t = row.get("Time")
-            if t is not None and pd.notna(t):
-                try:
-                    sec = pd.to_timedelta(t).total_seconds()
-                    if sec > 0:
-                        time_secs.append(sec)
-                except Exception:
-                    pass
-        min_time_sec = min(time_secs) if time_secs else None
+        time_secs = pd.to_timedelta(results_df["Time"], errors="coerce").dt.total_seconds()
+        positive_secs = time_secs[time_secs > 0]
+        min_time_sec = float(positive_secs.min()) if not positive_secs.empty else None
+    else:
+        time_secs = pd.Series([float("nan")] * len(results_df), index=results_df.index)
 
+    # Один проход по колонкам (без построчных словарей): 22 строки картинки,
+    # результат пилота по коду и (позиция, очки) пилотов каждой команды
     rows_for_image: list[dict] = []
-    for _, row in results_df.head(22).iterrows():
-        pos = row.get("Position")
-        if pos is None:
+    res_map = {}
+    constructor_results_by_name: dict[str, list[tuple]] = {}
+    has_position = "Position" in results_df.columns
+    for i, (pos, abbr, number, given, family, team_name, raw_pts, sec) in enumerate(zip(
+        _column_values(results_df, "Position", None),
+        _column_values(results_df, "Abbreviation", ""),
+        _column_values(results_df, "DriverNumber", "?"),
+        _column_values(results_df, "FirstName", ""),
+        _column_values(results_df, "LastName", ""),
+        _column_values(results_df, "TeamName", None),
+        _column_values(results_df, "Points", 0),
+        time_secs.tolist(),
+    )):
+        pos_val = pos if has_position else "DNF"
+        pos_int = _position_int(pos_val)
+        res_pts = raw_pts
+        if res_pts is None or pd.isna(res_pts) or (isinstance(res_pts, (int, float)) and res_pts == 0):
+            res_pts = points_for_race_position(pos_int) if pos_int is not None else 0
+        res_map[str(abbr).upper()] = {"pos": str(pos_val), "points": res_pts}
+        if team_name:
+            constructor_results_by_name.setdefault(team_name, []).append((pos_int, raw_pts))
+
+        if i >= 22 or pos is None:
             continue
-        code = str(row.get("Abbreviation", "?") or row.get("DriverNumber", "?"))
-        given = str(row.get("FirstName", "") or "")
-        family = str(row.get("LastName", "") or "")
+        code = str(abbr or number).upper()
+        given = str(given or "")
+        family = str(family or "")
         full_name = f"{given} {family}".strip() or code
-        team = str(row.get("TeamName", "") or "") or code_to_team.get(code.upper(), "")
+        team = str(team_name or "") or code_to_team.get(code, "")
 
         gap_str = "-"
-        if has_time and min_time_sec is not None:
-            t = row.get("Time")
-            if t is not None and pd.notna(t):
-                try:
-                    sec = pd.to_timedelta(t).total_seconds()
-                    if sec > 0:
-                        if sec <= min_time_sec:
-                            h, m = int(sec // 3600), int((sec % 3600) // 60)
-                            s = sec % 60
-                            gap_str = f"{h}:{m:02d}:{s:05.2f}" if h > 0 else f"{m}:{s:05.2f}"
-                        else:
-                            gap_str = f"+{sec - min_time_sec:.3f}"
-                except Exception:
-                    pass
-
-        pts_val = row.get("Points")
-        pts = int(float(pts_val)) if pts_val is not None and pd.notna(pts_val) else 0
-        if pts == 0:
-            try:
-                pos_int = int(pos) if pos not in ("?", "", None) else 0
-            except (TypeError, ValueError):
-                pos_int = 0
+        if min_time_sec is not None and sec > 0:
+            if sec <= min_time_sec:
+                h, m = int(sec // 3600), int((sec % 3600) // 60)
+                s = sec % 60
+                gap_str = f"{h}:{m:02d}:{s:05.2f}" if h > 0 else f"{m}:{s:05.2f}"
+            else:
+                gap_str = f"+{sec - min_time_sec:.3f}"
+
+        pts = int(float(raw_pts)) if raw_pts is not None and pd.notna(raw_pts) else 0
+        if pts == 0 and pos_int is not None:
             pts = points_for_race_position(pos_int)
 
         rows_for_image.append({
-            "pos": int(pos) if pos != "?" else "?",
+            "pos": pos_int if pos_int is not None else "?",
             "driver": full_name,
             "team": team,
             "gap_or_time": gap_str,
             "points": pts,
-            "driver_code": code.upper() if code else "",
+            "driver_code": code,
         })
 
     if len(rows_for_image) < RACE_RESULTS_MIN_ROWS:
@@ -854,85 +1023,86 @@ async def check_and_send_results(bot: Bot):
             favorite_driver_codes=fav_codes,
         )
 
-    # Общая картинка для групп (без избранных)
-    photo_bytes_generic = (await asyncio.to_thread(_render_race_image, None)).getvalue()
+    # Общая картинка для всех (без избранных): байты уходят в Telegram один раз, дальше file_id
+    generic_photo = SharedPhoto((await asyncio.to_thread(_render_race_image, None)).getvalue())
 
-    res_map = {}
-    for _, row in results_df.iterrows():
-        code = str(row.get("Abbreviation", "")).upper()
-        pts = row.get("Points", 0)
-        if pts is None or pd.isna(pts) or (isinstance(pts, (int, float)) and pts == 0):
-            pos_val = row.get("Position")
-            try:
-                pts = points_for_race_position(int(pos_val)) if pos_val not in ("?", "", None) else 0
-            except (TypeError, ValueError):
-                pts = 0
-        res_map[code] = {"pos": str(row.get("Position", "DNF")), "points": pts}
-
-    constructor_results_by_name = {}
-    for row in results_df.itertuples(index=False):
-        team_name = getattr(row, "TeamName", None)
-        if team_name:
-            if team_name not in constructor_results_by_name:
-                constructor_results_by_name[team_name] = []
-            constructor_results_by_name[team_name].append(row)
-
-    sent_count = 0
     # Общая классификация приходит картинкой, а избранные — отдельным сообщением.
     notification_recipients = [(u[0], u[1] or "Europe/Moscow") for u in notifications_users]
-    for tg_id, tz in notification_recipients:
-        if await safe_send_photo(
+    sent_count = await broadcast(
+        notification_recipients,
+        lambda recipient: safe_send_photo(
             bot,
-            tg_id,
-            photo_bytes_generic,
+            recipient[0],
+            generic_photo,
             caption="🏁 Результаты последней гонки (таблица на картинке).",
-            parse_mode="HTML",
             has_spoiler=True,
-            disable_notification=is_quiet_hours(tz),
-        ):
-            sent_count += 1
-        await asyncio.sleep(0.05)
+            disable_notification=is_quiet_hours(recipient[1]),
+        ),
+    )
 
+    # У многих пользователей одни и те же фавориты: строку команды и итоговый текст
+    # считаем один раз на команду / набор избранного, а не на каждого пользователя.
+    team_texts: dict[str, str | None] = {}
+    team_keys_lower = [(key.lower(), key) for key in constructor_results_by_name]
+
+    def _team_result_text(team_name: str) -> str | None:
+        if team_name in team_texts:
+            return team_texts[team_name]
+        team_rows = constructor_results_by_name.get(team_name)
+        if team_rows is None:
+            tn_lower = team_name.lower()
+            key = next((orig for low, orig in team_keys_lower if tn_lower in low or low in tn_lower), None)
+            if key is not None:
+                team_rows = constructor_results_by_name[key]
+        text = None
+        if team_rows:
+            total_pts = sum(float(pts or 0) for _, pts in team_rows)
+            if total_pts == 0:
+                total_pts = sum(points_for_race_position(pos) for pos, _ in team_rows if pos is not None)
+            best_pos = min((pos for pos, _ in team_rows if pos is not None), default="?")
+            text = f"P{best_pos}, +{int(total_pts)} очк."
+        team_texts[team_name] = text
+        return text
+
+    captions: dict[tuple[tuple[str, ...], tuple[str, ...]], str | None] = {}
+    favorites_messages: list[tuple[int, str]] = []
     for tg_id, favs in users_favorites.items():
-        driver_res = []
-        for code in favs.get("drivers", []):
-            if code in res_map:
-                driver_res.append({"code": code, **res_map[code]})
-
-        team_res = []
-        for team_name in favs.get("teams", []):
-            team_rows = constructor_results_by_name.get(team_name)
-            if team_rows is None:
-                tn_lower = team_name.lower()
-                for key, rows in constructor_results_by_name.items():
-                    if tn_lower in key.lower() or key.lower() in tn_lower:
-                        team_rows = rows
-                        break
-            if team_rows:
-                total_pts = sum(float(getattr(r, "Points", 0) or 0) for r in team_rows)
-                if total_pts == 0:
-                    total_pts = sum(points_for_race_position(int(getattr(r, "Position", 0))) for r in team_rows)
-                best_pos = min(int(getattr(r, "Position", 999)) for r in team_rows)
-                team_res.append({"team": team_name, "text": f"P{best_pos}, +{int(total_pts)} очк."})
-
-        if not driver_res and not team_res:
+        fav_key = (tuple(favs.get("drivers", [])), tuple(favs.get("teams", [])))
+        if not fav_key[0] and not fav_key[1]:
             continue
-        caption = build_favorites_caption(race_info.get("event_name", "Гран-при"), driver_res, team_res)
-        tz = tz_map.get(tg_id, "Europe/Moscow")
-        quiet = is_quiet_hours(tz)
-        if await safe_send_message(
+        if fav_key not in captions:
+            driver_res = [{"code": code, **res_map[code]} for code in fav_key[0] if code in res_map]
+            team_res = []
+            for team_name in fav_key[1]:
+                team_text = _team_result_text(team_name)
+                if team_text:
+                    team_res.append({"team": team_name, "text": team_text})
+            captions[fav_key] = (
+                build_favorites_caption(race_info.get("event_name", "Гран-при"), driver_res, team_res)
+                if driver_res or team_res else None
+            )
+        if captions[fav_key] is not None:
+            favorites_messages.append((tg_id, captions[fav_key]))
+
+    # Тихий режим всех пользователей нужен только для сообщений по избранному
+    quiet_map: dict[int, bool] = {}
+    if favorites_messages:
+        quiet_map = _quiet_by_user(await get_users_with_settings())
+    default_quiet = is_quiet_hours("Europe/Moscow")
+
+    sent_count += await broadcast(
+        favorites_messages,
+        lambda message: safe_send_message(
             bot,
-            tg_id,
-            caption,
-            parse_mode="HTML",
-            disable_notification=quiet,
-        ):
-            sent_count += 1
-        await asyncio.sleep(0.05)
+            message[0],
+            message[1],
+            disable_notification=quiet_map.get(message[0], default_quiet),
+        ),
+    )
 
     # Напоминание о голосовании — всем с включёнными уведомлениями (если ещё не отправляли)
     if voting_invite_sent is None or voting_invite_sent < round_num:
-        voting_users = await get_users_with_settings(notifications_only=True)
+        voting_users = enabled_users
         event_name = race_info.get("event_name", "Гран-при")
         voting_text = (
             f"🗳 <b>Приглашаем на голосование!</b>\n\n"
@@ -940,25 +1110,27 @@ async def check_and_send_results(bot: Bot):
             f"Оцените этап по 5-балльной шкале и выберите пилота дня — "
             f"откройте раздел <b>Голосование</b> в MiniWebApp слева по кнопке."
         )
-        for u in voting_users:
-            tg_id, tz = u[0], u[1] or "Europe/Moscow"
-            quiet = is_quiet_hours(tz)
-            await safe_send_message(bot, tg_id, voting_text, parse_mode="HTML", disable_notification=quiet)
-            await asyncio.sleep(0.05)
+        await broadcast(
+            voting_users,
+            lambda u: safe_send_message(
+                bot, u[0], voting_text,
+                disable_notification=is_quiet_hours(u[1] or "Europe/Moscow"),
+            ),
+        )
         await set_last_notified_voting_invite_round(season, round_num)
 
     # === Результаты в группы (общая картинка, без избранного) ===
     group_caption = f"🏁 {event_name} — этап {round_num}, сезон {season}\n\n📊 Результаты на картинке."
-    for chat_id in group_chats:
-        if await safe_send_photo(
-            bot, chat_id, photo_bytes_generic,
+    sent_count += await broadcast(
+        group_chats,
+        lambda chat_id: safe_send_photo(
+            bot, chat_id, generic_photo,
             caption=group_caption,
-            parse_mode="HTML",
             disable_notification=is_quiet_hours(GROUP_TIMEZONE),
-        ):
-            sent_count += 1
-        await asyncio.sleep(0.05)
+        ),
+    )
 
+    await _disable_blocked_users()
     if sent_count > 0:
         await set_last_notified_round(season, round_num)
     else:
@@ -969,20 +1141,31 @@ async def check_and_send_results(bot: Bot):
 
 async def check_and_notify_quali(bot: Bot) -> bool:
     """Отправляет полную квалификацию и отдельное сообщение по избранному."""
-    season = datetime.now(timezone.utc).year
+    now = datetime.now(timezone.utc)
+    season = now.year
+    last_notified = await get_last_notified_quali_round(season)
+    schedule = await _get_schedule(season)
+    # Между уикендами последняя завершённая квала уже разослана: не скачиваем её результаты
+    # заново на каждом тике, пока по расписанию не закончится следующая
+    latest_finished = _latest_finished_session(schedule, "quali_start_utc", 75, now)
+    if (
+        latest_finished is not None
+        and last_notified is not None
+        and last_notified >= int(latest_finished["round"])
+    ):
+        return True
+
     data = await _get_latest_quali_async(season)
     if not data or data[0] is None:
         return True
 
     round_num, results = data
-    last_notified = await get_last_notified_quali_round(season)
     if last_notified is not None and last_notified >= round_num:
         return True
 
-    schedule = await get_season_schedule_short_async(season)
     race_info = next((r for r in schedule if r["round"] == round_num), None) if schedule else None
     if race_info and race_info.get("quali_start_utc"):
-        finished = _latest_finished_session([race_info], "quali_start_utc", 75)
+        finished = _latest_finished_session([race_info], "quali_start_utc", 75, now)
         if finished is None:
             return True
 
@@ -1034,9 +1217,10 @@ async def check_and_notify_quali(bot: Bot) -> bool:
 
 
 async def check_and_notify_sprint_quali(bot: Bot) -> bool:
-    season = datetime.now(timezone.utc).year
-    schedule = await get_season_schedule_short_async(season)
-    event = _latest_finished_session(schedule, "sprint_quali_start_utc", 45)
+    now = datetime.now(timezone.utc)
+    season = now.year
+    schedule = await _get_schedule(season)
+    event = _latest_finished_session(schedule, "sprint_quali_start_utc", 45, now)
     if event is None:
         return True
     round_num = int(event["round"])
@@ -1066,9 +1250,10 @@ async def check_and_notify_sprint_quali(bot: Bot) -> bool:
 
 
 async def check_and_notify_sprint(bot: Bot) -> bool:
-    season = datetime.now(timezone.utc).year
-    schedule = await get_season_schedule_short_async(season)
-    event = _latest_finished_session(schedule, "sprint_start_utc", 60)
+    now = datetime.now(timezone.utc)
+    season = now.year
+    schedule = await _get_schedule(season)
+    event = _latest_finished_session(schedule, "sprint_start_utc", 60, now)
     if event is None:
         return True
     round_num = int(event["round"])
@@ -1125,13 +1310,10 @@ def _voting_closes_at(event: dict) -> datetime | None:
 
     race_start = event.get("race_start_utc")
     if race_start:
-        try:
-            race_dt = datetime.fromisoformat(str(race_start).replace("Z", "+00:00"))
-            if race_dt.tzinfo is None:
-                race_dt = race_dt.replace(tzinfo=timezone.utc)
+        race_dt = _parse_utc(race_start)
+        if race_dt is not None:
             return race_dt.astimezone(timezone.utc) + timedelta(days=DRIVER_VOTING_DAYS)
-        except (TypeError, ValueError):
-            logger.warning("Invalid race_start_utc for voting round: %r", race_start)
+        logger.warning("Invalid race_start_utc for voting round: %r", race_start)
 
     date_str = event.get("date")
     if not date_str:
@@ -1152,13 +1334,13 @@ async def check_and_notify_voting_results(bot: Bot) -> None:
     Сразу после закрытия трёхдневного окна отправляем итоги голосования:
     «По мнению нашего сообщества этап оценили на: X. Лучшим пилотом стал: Y.»
     """
-    season = datetime.now(timezone.utc).year
-    schedule = await get_season_schedule_short_async(season)
+    now_utc = datetime.now(timezone.utc)
+    season = now_utc.year
+    schedule = await _get_schedule(season)
     if not schedule:
         return
 
     last_notified = await get_last_notified_voting_round(season)
-    now_utc = datetime.now(timezone.utc)
     users = await get_users_with_settings(notifications_only=True)
     if not users:
         return
@@ -1177,8 +1359,10 @@ async def check_and_notify_voting_results(bot: Bot) -> None:
             continue
 
         event_name = event.get("event_name", "Гран-при")
-        avg_rating, race_count = await get_race_avg_for_round(season, round_num)
-        driver_winner, driver_count = await get_driver_vote_winner(season, round_num)
+        (avg_rating, race_count), (driver_winner, driver_count) = await asyncio.gather(
+            get_race_avg_for_round(season, round_num),
+            get_driver_vote_winner(season, round_num),
+        )
 
         if race_count == 0 and driver_count == 0:
             await set_last_notified_voting_round(season, round_num)
@@ -1206,22 +1390,27 @@ async def check_and_notify_voting_results(bot: Bot) -> None:
             f"Лучшим пилотом стал: <b>{driver_str}</b>"
         )
 
-        sent_count = 0
-        for tg_id in tz_map:
-            tz_name = tz_map[tg_id]
+        sent_marks: list[tuple[int, int, int, bool, int]] = []
+
+        async def _send_results(tg_id, round_num=round_num, text=text) -> bool:
             if await was_reminder_sent(tg_id, season, round_num, False, VOTING_RESULTS_NOTIFY_KEY):
-                continue
+                return False
+            quiet = is_quiet_hours(tz_map[tg_id])
+            if await safe_send_message(bot, tg_id, text, disable_notification=quiet):
+                sent_marks.append((tg_id, season, round_num, False, VOTING_RESULTS_NOTIFY_KEY))
+                return True
+            return False
 
-            quiet = is_quiet_hours(tz_name)
-            if await safe_send_message(bot, tg_id, text, parse_mode="HTML", disable_notification=quiet):
-                sent_count += 1
-                await set_reminder_sent(tg_id, season, round_num, False, VOTING_RESULTS_NOTIFY_KEY)
-            await asyncio.sleep(0.05)
+        try:
+            sent_count = await broadcast(tz_map, _send_results)
+        finally:
+            # До проверки all_users_notified ниже — она читает эти отметки из БД
+            await set_reminders_sent(sent_marks)
 
         if sent_count > 0:
             logger.info(f"✅ Sent voting results for {event_name} to {sent_count} users.")
         else:
-            logger.info(
+            logger.debug(
                 "Voting results for %s are pending: no eligible delivery succeeded in this run.",
                 event_name,
             )
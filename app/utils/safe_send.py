@@ -1,7 +1,10 @@
 import asyncio
 import logging
+import random
+import time
+from contextvars import ContextVar
 from io import BytesIO
-from typing import Sequence
+from typing import Awaitable, Callable, Iterable, Sequence, TypeVar
 
 from aiogram import Bot
 from aiogram.exceptions import TelegramNetworkError, TelegramForbiddenError, TelegramRetryAfter, TelegramBadRequest
@@ -11,6 +14,108 @@ from aiogram.types import BufferedInputFile, Message, CallbackQuery, InputMediaP
 logger = logging.getLogger(__name__)
 
 
+class TokenBucket:
+    """
+    Асинхронный ограничитель частоты (token bucket) для рассылок.
+
+    rate — сколько отправок в секунду пропускаем в среднем, capacity — допустимый всплеск.
+    Без блокировок: в одном event loop резерв токена атомарен (до await), поэтому
+    конкурентные отправки просто встают в очередь по времени, уходя в «долг».
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+
+# Общий лимит бота в Telegram — ~30 сообщений в секунду на все чаты.
+# Через него идут только отправки из broadcast(): ответы на команды не встают в очередь за рассылкой
+SEND_LIMITER = TokenBucket(rate=30, capacity=30)
+_IN_BROADCAST: ContextVar[bool] = ContextVar("in_broadcast", default=False)
+
+# Чаты, ответившие TelegramForbiddenError: рассылки забирают их пачкой через pop_blocked_chats()
+_blocked_chats: set[int] = set()
+
+
+# Потолок паузы между повторами при сетевой ошибке, секунды
+RETRY_MAX_DELAY = 10.0
+
+
+def _backoff(attempt: int, base: float = 1.0) -> float:
+    """
+    Пауза перед повтором attempt: экспоненциальный рост с джиттером ±50%,
+    чтобы параллельные отправки после сбоя не повторялись синхронно.
+    """
+    return min(RETRY_MAX_DELAY, base * 2 ** (attempt - 1)) * (0.5 + random.random())
+
+
+async def _throttle() -> None:
+    """Ждёт токен SEND_LIMITER, если отправка идёт из воркера рассылки."""
+    if _IN_BROADCAST.get():
+        await SEND_LIMITER.acquire()
+
+
+def pop_blocked_chats() -> set[int]:
+    """Возвращает и очищает накопленные chat_id, заблокировавшие бота."""
+    blocked = set(_blocked_chats)
+    _blocked_chats.clear()
+    return blocked
+
+
+# Сколько отправок держим «в полёте» при рассылке; общий темп задаёт SEND_LIMITER
+BROADCAST_WORKERS = 8
+
+_T = TypeVar("_T")
+
+
+async def broadcast(
+    items: Iterable[_T],
+    send: Callable[[_T], Awaitable[int | bool]],
+    workers: int = BROADCAST_WORKERS,
+) -> int:
+    """
+    Рассылка через ограниченную очередь и пул воркеров: получатели не превращаются
+    в N одновременных корутин, а сетевые ожидания соседних отправок перекрываются.
+    send возвращает True/число отправленных сообщений. Возвращает сумму успешных отправок.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+    delivered = 0
+
+    async def _worker() -> None:
+        nonlocal delivered
+        # У каждой задачи своя копия контекста — флаг не утекает к вызывающему
+        _IN_BROADCAST.set(True)
+        while True:
+            item = await queue.get()
+            try:
+                delivered += int(await send(item))
+            except Exception:
+                logger.exception("Broadcast delivery failed for %r", item)
+            finally:
+                queue.task_done()
+
+    tasks = [asyncio.create_task(_worker()) for _ in range(workers)]
+    try:
+        for item in items:
+            await queue.put(item)
+        await queue.join()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return delivered
+
+
 async def safe_answer(
     message: Message,
     text: str,
@@ -22,7 +127,7 @@ async def safe_answer(
     Безопасная отправка message.answer с ретраями при TelegramNetworkError.
 
     retries — сколько всего попыток.
-    delay — пауза между попытками в секундах.
+    delay — базовая пауза между попытками в секундах (дальше растёт экспоненциально).
     **kwargs — всё, что ты обычно передаёшь в message.answer(...).
     """
     last_exc: Exception | None = None
@@ -48,34 +153,87 @@ async def safe_answer(
                 )
                 return None
 
-            await asyncio.sleep(delay)
+            await asyncio.sleep(_backoff(attempt, delay))
 
     return None
 
 
+class SharedPhoto:
+    """
+    Одна картинка для массовой рассылки.
+
+    Байты загружаются в Telegram только при первой успешной отправке, дальше
+    всем получателям уходит file_id с серверов Telegram.
+    """
+
+    def __init__(self, data: bytes, filename: str = "f1hub-results.png"):
+        self.data = data
+        self.filename = filename
+        self.file_id: str | None = None
+        self._upload_lock = asyncio.Lock()
+
+
+async def _send_photo(
+    bot: Bot,
+    chat_id: int,
+    photo,
+    caption: str = "",
+    retries: int = 3,
+    **kwargs,
+) -> Message | None:
+    normalized_photo = photo
+    if isinstance(photo, BytesIO):
+        normalized_photo = BufferedInputFile(photo.getvalue(), filename="f1hub-results.png")
+    elif isinstance(photo, (bytes, bytearray, memoryview)):
+        normalized_photo = BufferedInputFile(bytes(photo), filename="f1hub-results.png")
+
+    for attempt in range(1, retries + 1):
+        try:
+            await _throttle()
+            return await bot.send_photo(chat_id=chat_id, photo=normalized_photo, caption=caption or None, **kwargs)
+        except TelegramForbiddenError:
+            logger.warning(f"User {chat_id} blocked the bot.")
+            _blocked_chats.add(chat_id)
+            return None
+        except TelegramRetryAfter as e:
+            if attempt == retries:
+                logger.error("FloodWait retries exhausted for photo to %s", chat_id)
+                return None
+            logger.warning(f"FloodWait: Sleeping {e.retry_after} seconds for user {chat_id}...")
+            await asyncio.sleep(e.retry_after)
+        except TelegramNetworkError as e:
+            if attempt == retries:
+                logger.error("Network retries exhausted for photo to %s: %s", chat_id, e)
+                return None
+            await asyncio.sleep(_backoff(attempt))
+        except TelegramBadRequest as e:
+            logger.error(f"Bad Request for user {chat_id}: {e}")
+            return None
+        except Exception as e:
+            logger.exception(f"Unexpected error sending photo to {chat_id}: {e}")
+            return None
+    return None
+
+
+async def _send_shared_photo(bot: Bot, chat_id: int, photo: SharedPhoto, caption: str = "", **kwargs) -> bool:
+    if photo.file_id is None:
+        # Пока первая загрузка не завершилась, остальные ждут её file_id,
+        # а не заливают те же байты параллельно
+        async with photo._upload_lock:
+            if photo.file_id is None:
+                upload = BufferedInputFile(photo.data, filename=photo.filename)
+                sent = await _send_photo(bot, chat_id, upload, caption, **kwargs)
+                if sent is not None and getattr(sent, "photo", None):
+                    photo.file_id = sent.photo[-1].file_id
+                return sent is not None
+    return await _send_photo(bot, chat_id, photo.file_id, caption, **kwargs) is not None
+
+
 async def safe_send_photo(bot: Bot, chat_id: int, photo, caption: str = "", **kwargs) -> bool:
-    """Безопасная отправка фото (BytesIO, bytes или file_id)."""
-    try:
-        normalized_photo = photo
-        if isinstance(photo, BytesIO):
-            normalized_photo = BufferedInputFile(photo.getvalue(), filename="f1hub-results.png")
-        elif isinstance(photo, (bytes, bytearray, memoryview)):
-            normalized_photo = BufferedInputFile(bytes(photo), filename="f1hub-results.png")
-        await bot.send_photo(chat_id=chat_id, photo=normalized_photo, caption=caption or None, **kwargs)
-        return True
-    except TelegramForbiddenError:
-        logger.warning(f"User {chat_id} blocked the bot.")
-        return False
-    except TelegramRetryAfter as e:
-        logger.warning(f"FloodWait: Sleeping {e.retry_after} seconds for user {chat_id}...")
-        await asyncio.sleep(e.retry_after)
-        return await safe_send_photo(bot, chat_id, photo, caption, **kwargs)
-    except TelegramBadRequest as e:
-        logger.error(f"Bad Request for user {chat_id}: {e}")
-        return False
-    except Exception as e:
-        logger.exception(f"Unexpected error sending photo to {chat_id}: {e}")
-        return False
+    """Безопасная отправка фото (BytesIO, bytes, file_id или SharedPhoto)."""
+    if isinstance(photo, SharedPhoto):
+        return await _send_shared_photo(bot, chat_id, photo, caption, **kwargs)
+    return await _send_photo(bot, chat_id, photo, caption, **kwargs) is not None
 
 
 async def safe_send_media_group(
@@ -92,10 +250,12 @@ async def safe_send_media_group(
 
     for attempt in range(1, retries + 1):
         try:
+            await _throttle()
             await bot.send_media_group(chat_id=chat_id, media=list(media), **kwargs)
             return True
         except TelegramForbiddenError:
             logger.warning("User %s blocked the bot.", chat_id)
+            _blocked_chats.add(chat_id)
             return False
         except TelegramRetryAfter as exc:
             if attempt == retries:
@@ -106,7 +266,7 @@ async def safe_send_media_group(
             if attempt == retries:
                 logger.error("Network retries exhausted for media group to %s: %s", chat_id, exc)
                 return False
-            await asyncio.sleep(float(attempt))
+            await asyncio.sleep(_backoff(attempt))
         except TelegramBadRequest as exc:
             logger.error("Bad media group request for %s: %s", chat_id, exc)
             return False
@@ -117,28 +277,39 @@ async def safe_send_media_group(
     return False
 
 
-async def safe_send_message(bot: Bot, chat_id: int, text: str, **kwargs) -> bool:
+async def safe_send_message(bot: Bot, chat_id: int, text: str, retries: int = 3, **kwargs) -> bool:
     """
     Безопасная отправка сообщения с обработкой ошибок и FloodWait.
     Возвращает True, если отправлено успешно.
+    При FloodWait/сетевой ошибке делает не больше retries попыток (циклом, без рекурсии).
     """
-    try:
-        await bot.send_message(chat_id=chat_id, text=text, **kwargs)
-        return True
-    except TelegramForbiddenError:
-        logger.warning(f"User {chat_id} blocked the bot. Removing from DB recommended.")
-        # TODO: Можно добавить логику удаления юзера из БД здесь
-        return False
-    except TelegramRetryAfter as e:
-        logger.warning(f"FloodWait: Sleeping {e.retry_after} seconds for user {chat_id}...")
-        await asyncio.sleep(e.retry_after)
-        return await safe_send_message(bot, chat_id, text, **kwargs) # Рекурсивная попытка
-    except TelegramBadRequest as e:
-        logger.error(f"Bad Request for user {chat_id}: {e}")
-        return False
-    except Exception as e:
-        logger.exception(f"Unexpected error sending message to {chat_id}: {e}")
-        return False
+    for attempt in range(1, retries + 1):
+        try:
+            await _throttle()
+            await bot.send_message(chat_id=chat_id, text=text, **kwargs)
+            return True
+        except TelegramForbiddenError:
+            logger.warning(f"User {chat_id} blocked the bot.")
+            _blocked_chats.add(chat_id)
+            return False
+        except TelegramRetryAfter as e:
+            if attempt == retries:
+                logger.error("FloodWait retries exhausted for message to %s", chat_id)
+                return False
+            logger.warning(f"FloodWait: Sleeping {e.retry_after} seconds for user {chat_id}...")
+            await asyncio.sleep(e.retry_after)
+        except TelegramNetworkError as e:
+            if attempt == retries:
+                logger.error("Network retries exhausted for message to %s: %s", chat_id, e)
+                return False
+            await asyncio.sleep(_backoff(attempt))
+        except TelegramBadRequest as e:
+            logger.error(f"Bad Request for user {chat_id}: {e}")
+            return False
+        except Exception as e:
+            logger.exception(f"Unexpected error sending message to {chat_id}: {e}")
+            return False
+    return False
 
 
 async def safe_answer_callback(callback: CallbackQuery, *args, **kwargs) -> bool:
@@ -1,11 +1,27 @@
-from datetime import datetime
-import pytz
+import functools
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 RU_MONTHS = {
     1: 'января', 2: 'февраля', 3: 'марта', 4: 'апреля', 5: 'мая', 6: 'июня',
     7: 'июля', 8: 'августа', 9: 'сентября', 10: 'октября', 11: 'ноября', 12: 'декабря'
 }
 
+@functools.lru_cache(maxsize=256)
+def _user_tz(user_timezone_str: str | None):
+    """
+    Таймзона пользователя; расписание форматирует одну и ту же зону для каждой сессии.
+    Пустая или битая зона — Europe/Moscow, как было с pytz.
+    """
+    try:
+        return ZoneInfo(user_timezone_str or "Europe/Moscow")
+    except (ZoneInfoNotFoundError, ValueError, TypeError):
+        return ZoneInfo("Europe/Moscow")
+
+
+# Результат зависит только от (время, таймзона): расписание и /next_race
+# форматируют одни и те же сессии для одних и тех же зон
+@functools.lru_cache(maxsize=4096)
 def format_race_time(utc_time_str: str, user_timezone_str: str = "Europe/Moscow") -> str:
     """
     Принимает UTC строку.
@@ -17,16 +33,11 @@ def format_race_time(utc_time_str: str, user_timezone_str: str = "Europe/Moscow"
     try:
         utc_dt = datetime.fromisoformat(utc_time_str.replace("Z", "+00:00"))
         if utc_dt.tzinfo is None:
-            utc_dt = utc_dt.replace(tzinfo=pytz.utc)
+            utc_dt = utc_dt.replace(tzinfo=timezone.utc)
     except ValueError:
         return utc_time_str
 
-    try:
-        user_tz = pytz.timezone(user_timezone_str)
-    except pytz.UnknownTimeZoneError:
-        user_tz = pytz.timezone("Europe/Moscow")
-
-    local_dt = utc_dt.astimezone(user_tz)
+    local_dt = utc_dt.astimezone(_user_tz(user_timezone_str))
 
     day = local_dt.day
     month_name = RU_MONTHS.get(local_dt.month, "")
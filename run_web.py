@@ -7,11 +7,15 @@ import os
 import uvicorn
 
 if __name__ == "__main__":
+    reload = os.getenv("WEB_RELOAD", "false").lower() in {"1", "true", "yes"}
     uvicorn.run(
         "app.api.miniapp_api:web_app",
         host="0.0.0.0",
         port=int(os.getenv("WEB_PORT", "8000")),
-        reload=os.getenv("WEB_RELOAD", "false").lower() in {"1", "true", "yes"},
+        reload=reload,
+        # Несколько процессов — только без reload (uvicorn их не совмещает).
+        # uvloop и httptools uvicorn подхватывает сам, если они установлены.
+        workers=1 if reload else int(os.getenv("WEB_WORKERS", "1")),
         proxy_headers=True,
         forwarded_allow_ips=os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"),
     )
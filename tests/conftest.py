@@ -6,10 +6,16 @@ import tempfile
 from pathlib import Path
 from typing import Optional
 
+import pandas as pd
 import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
 
+try:
+    import uvloop
+except ImportError:  # Windows
+    uvloop = None
+
 # Устанавливаем тестовые переменные окружения ДО импорта app
 os.environ.setdefault("BOT_TOKEN", "123456:TEST")
 os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
@@ -36,6 +42,14 @@ def pytest_runtest_setup(item: pytest.Item) -> None:
     tr.write_line(f"[CHECK] {item.nodeid} -> {_test_description(item)}")
 
 
+@pytest.hookimpl(optionalhook=True)
+def pytest_asyncio_loop_factories(config, item):
+    """Тесты крутятся на uvloop, как и прод (кроме Windows, где его нет)."""
+    if uvloop is None:
+        return None
+    return {"uvloop": uvloop.new_event_loop}
+
+
 @pytest_asyncio.fixture
 async def temp_db_path():
     """Временная БД для изолированных тестов."""
@@ -99,26 +113,28 @@ async def api_client(app_with_overrides):
         yield client
 
 
+# Таблицы строим один раз, фикстуры отдают копии (тест может менять DataFrame)
+_DRIVER_STANDINGS_DF = pd.DataFrame([
+    {"position": 1, "points": 100, "driverCode": "VER", "givenName": "Max", "familyName": "Verstappen", "constructorId": "red_bull", "constructorName": "Red Bull", "driverId": "verstappen", "permanentNumber": "1"},
+    {"position": 2, "points": 85, "driverCode": "NOR", "givenName": "Lando", "familyName": "Norris", "constructorId": "mclaren", "constructorName": "McLaren", "driverId": "norris", "permanentNumber": "4"},
+])
+
+_CONSTRUCTOR_STANDINGS_DF = pd.DataFrame([
+    {"position": 1, "points": 180, "constructorId": "red_bull", "constructorName": "Red Bull"},
+    {"position": 2, "points": 150, "constructorId": "mclaren", "constructorName": "McLaren"},
+])
+
+
 @pytest.fixture
 def sample_driver_standings_df():
     """Пример DataFrame для тестов standings."""
-    import pandas as pd
-
-    return pd.DataFrame([
-        {"position": 1, "points": 100, "driverCode": "VER", "givenName": "Max", "familyName": "Verstappen", "constructorId": "red_bull", "constructorName": "Red Bull", "driverId": "verstappen", "permanentNumber": "1"},
-        {"position": 2, "points": 85, "driverCode": "NOR", "givenName": "Lando", "familyName": "Norris", "constructorId": "mclaren", "constructorName": "McLaren", "driverId": "norris", "permanentNumber": "4"},
-    ])
+    return _DRIVER_STANDINGS_DF.copy()
 
 
 @pytest.fixture
 def sample_constructor_standings_df():
     """Пример DataFrame для тестов constructors."""
-    import pandas as pd
-
-    return pd.DataFrame([
-        {"position": 1, "points": 180, "constructorId": "red_bull", "constructorName": "Red Bull"},
-        {"position": 2, "points": 150, "constructorId": "mclaren", "constructorName": "McLaren"},
-    ])
+    return _CONSTRUCTOR_STANDINGS_DF.copy()
 
 
 @pytest.fixture
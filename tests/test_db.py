@@ -8,7 +8,30 @@ from pathlib import Path
 import pytest
 import pytest_asyncio
 
-# Устанавливаем БД до импорта app
+from app.db import (
+    db,
+    get_or_create_user,
+    get_user_settings,
+    update_user_setting,
+    add_favorite_driver,
+    clear_favorite_drivers,
+    remove_favorite_driver,
+    get_favorite_drivers,
+    add_favorite_team,
+    remove_favorite_team,
+    get_favorite_teams,
+    get_users_favorites_for_notifications,
+    disable_notifications_for,
+    set_reminders_sent,
+    was_reminder_sent,
+    save_race_vote,
+    get_user_votes,
+    save_driver_vote,
+    get_race_vote_stats,
+    get_driver_vote_stats,
+    get_driver_vote_round_winners,
+)
+
 _db_path = None
 
 
@@ -20,8 +43,6 @@ async def db_session():
         _db_path = Path(f.name)
     os.environ["DATABASE_PATH"] = str(_db_path)
 
-    from app.db import db
-
     await db.connect()
     await db.init_tables()
     yield db
@@ -35,8 +56,6 @@ async def db_session():
 @pytest.mark.asyncio
 async def test_get_or_create_user(db_session):
     """get_or_create_user создаёт пользователя при первом обращении."""
-    from app.db import get_or_create_user
-
     user_id = await get_or_create_user(telegram_id=12345678)
     assert user_id > 0
 
@@ -48,8 +67,6 @@ async def test_get_or_create_user(db_session):
 @pytest.mark.asyncio
 async def test_get_user_settings_default(db_session):
     """get_user_settings возвращает настройки по умолчанию."""
-    from app.db import get_user_settings
-
     settings = await get_user_settings(telegram_id=999888)
     assert "timezone" in settings
     assert "notify_before" in settings
@@ -60,8 +77,6 @@ async def test_get_user_settings_default(db_session):
 @pytest.mark.asyncio
 async def test_update_user_setting(db_session):
     """update_user_setting сохраняет значение."""
-    from app.db import get_user_settings, update_user_setting, get_or_create_user
-
     await get_or_create_user(telegram_id=111222)
     await update_user_setting(111222, "timezone", "Europe/Moscow")
     await update_user_setting(111222, "notify_before", 120)
@@ -74,13 +89,6 @@ async def test_update_user_setting(db_session):
 @pytest.mark.asyncio
 async def test_favorite_drivers(db_session):
     """Добавление и удаление избранных пилотов."""
-    from app.db import (
-        add_favorite_driver,
-        remove_favorite_driver,
-        get_favorite_drivers,
-        get_or_create_user,
-    )
-
     await get_or_create_user(telegram_id=333444)
     await add_favorite_driver(333444, "VER")
     await add_favorite_driver(333444, "NOR")
@@ -94,17 +102,13 @@ async def test_favorite_drivers(db_session):
     assert "VER" not in favs
     assert "NOR" in favs
 
+    await clear_favorite_drivers(333444)
+    assert await get_favorite_drivers(333444) == []
+
 
 @pytest.mark.asyncio
 async def test_favorite_teams(db_session):
     """Добавление и удаление избранных команд."""
-    from app.db import (
-        add_favorite_team,
-        remove_favorite_team,
-        get_favorite_teams,
-        get_or_create_user,
-    )
-
     await get_or_create_user(telegram_id=555666)
     await add_favorite_team(555666, "Red Bull")
     await add_favorite_team(555666, "Ferrari")
@@ -119,11 +123,57 @@ async def test_favorite_teams(db_session):
     assert "Ferrari" in favs
 
 
+@pytest.mark.asyncio
+async def test_users_favorites_for_notifications(db_session):
+    """Избранные пилоты и команды всех пользователей собираются одним запросом."""
+    await add_favorite_driver(777001, "ver")
+    await add_favorite_team(777001, "Ferrari")
+    await add_favorite_team(777002, "McLaren")
+    await add_favorite_driver(777003, "NOR")
+    await update_user_setting(777001, "notifications_enabled", 1)
+    await update_user_setting(777002, "notifications_enabled", 1)
+    await update_user_setting(777003, "notifications_enabled", 0)
+
+    favs = await get_users_favorites_for_notifications()
+    assert favs[777001] == {"drivers": ["VER"], "teams": ["Ferrari"]}
+    assert favs[777002] == {"drivers": [], "teams": ["McLaren"]}
+    assert 777003 not in favs
+
+    all_favs = await get_users_favorites_for_notifications(notifications_only=False)
+    assert all_favs[777003] == {"drivers": ["NOR"], "teams": []}
+
+
+@pytest.mark.asyncio
+async def test_disable_notifications_for_blocked_users(db_session):
+    """Заблокировавшим бота выключаются только уведомления, избранное остаётся."""
+    await add_favorite_driver(777101, "VER")
+    await add_favorite_driver(777102, "NOR")
+    await update_user_setting(777101, "notifications_enabled", 1)
+    await update_user_setting(777102, "notifications_enabled", 1)
+
+    await disable_notifications_for({777101})
+
+    favs = await get_users_favorites_for_notifications()
+    assert 777101 not in favs
+    assert 777102 in favs
+    all_favs = await get_users_favorites_for_notifications(notifications_only=False)
+    assert all_favs[777101] == {"drivers": ["VER"], "teams": []}
+
+
+@pytest.mark.asyncio
+async def test_set_reminders_sent_marks_all_rows(db_session):
+    """Пакетная отметка напоминаний видна через was_reminder_sent."""
+    await set_reminders_sent([(1001, 2026, 5, False, 60), (-2002, 2026, 5, True, 60)])
+    await set_reminders_sent([])
+
+    assert await was_reminder_sent(1001, 2026, 5, False, 60)
+    assert await was_reminder_sent(-2002, 2026, 5, True, 60)
+    assert not await was_reminder_sent(1001, 2026, 5, True, 60)
+
+
 @pytest.mark.asyncio
 async def test_race_votes(db_session):
     """Сохранение и получение оценок гонок."""
-    from app.db import save_race_vote, get_user_votes, get_or_create_user
-
     await get_or_create_user(telegram_id=777888)
     await save_race_vote(777888, 2024, 1, 5)
     await save_race_vote(777888, 2024, 2, 4)
@@ -136,8 +186,6 @@ async def test_race_votes(db_session):
 @pytest.mark.asyncio
 async def test_driver_votes(db_session):
     """Сохранение и получение голосов за пилота дня."""
-    from app.db import save_driver_vote, get_user_votes, get_or_create_user
-
     await get_or_create_user(telegram_id=999000)
     await save_driver_vote(999000, 2024, 1, "VER")
 
@@ -148,8 +196,6 @@ async def test_driver_votes(db_session):
 @pytest.mark.asyncio
 async def test_get_race_vote_stats(db_session):
     """get_race_vote_stats возвращает средние оценки."""
-    from app.db import save_race_vote, get_race_vote_stats, get_or_create_user
-
     await get_or_create_user(telegram_id=111333)
     await save_race_vote(111333, 2024, 1, 5)
     await save_race_vote(111333, 2024, 1, 3)
@@ -161,8 +207,6 @@ async def test_get_race_vote_stats(db_session):
 @pytest.mark.asyncio
 async def test_get_driver_vote_stats(db_session):
     """get_driver_vote_stats возвращает голоса за пилотов."""
-    from app.db import save_driver_vote, get_driver_vote_stats, get_or_create_user
-
     await get_or_create_user(telegram_id=222444)
     await save_driver_vote(222444, 2024, 1, "VER")
     await save_driver_vote(222444, 2024, 2, "VER")
@@ -174,8 +218,6 @@ async def test_get_driver_vote_stats(db_session):
 @pytest.mark.asyncio
 async def test_get_driver_vote_round_winners(db_session):
     """Победитель «Пилота дня» рассчитывается отдельно для каждого этапа."""
-    from app.db import get_driver_vote_round_winners, save_driver_vote
-
     season = 2037
     await save_driver_vote(101001, season, 1, "VER")
     await save_driver_vote(101002, season, 1, "VER")
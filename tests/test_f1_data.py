@@ -17,6 +17,7 @@ from app.f1_data import (
     get_season_schedule_short,
     get_sprint_quali_results_async,
     sort_standings_zero_last,
+    standings_records,
 )
 
 
@@ -113,6 +114,19 @@ def test_sort_standings_zero_last_none_handling():
     assert len(result) == 1
 
 
+def test_standings_records_sorts_and_keeps_source_frame():
+    """standings_records — dict'и по порядку позиций, пропуски → "", исходный DataFrame не меняется."""
+    df = pd.DataFrame([
+        {"position": "0", "points": 0, "driverCode": None},
+        {"position": "1", "points": 100, "driverCode": "VER"},
+    ])
+    records = standings_records(df)
+    assert [r["position"] for r in records] == [1, 0]
+    assert records[1]["driverCode"] == ""
+    assert list(df["position"]) == ["0", "1"]
+    assert standings_records(pd.DataFrame()) == []
+
+
 @pytest.mark.asyncio
 async def test_get_driver_details_uses_wiki_thumbnail_when_openf1_unavailable():
     """Если OpenF1 недоступен, карточка пилота получает headshot из Wikipedia thumbnail."""
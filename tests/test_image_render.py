@@ -0,0 +1,84 @@
+"""
+Тесты рендера картинок (image_render).
+"""
+from io import BytesIO
+from unittest.mock import patch
+
+from PIL import Image
+
+from app.utils import image_render
+from app.utils.image_render import FONT_ROW, _decode_image, _fit_text, _text_size
+
+
+def test_fit_text_keeps_text_that_fits():
+    text = "Max Verstappen"
+    width, height = _text_size(text, FONT_ROW)
+    assert _fit_text(text, FONT_ROW, width) == (text, height)
+
+
+def test_fit_text_truncates_to_longest_fitting_prefix():
+    """Бинарный поиск должен находить тот же префикс, что и посимвольное обрезание."""
+    text = "Andrea Kimi Antonelli"
+    max_w = _text_size("Andrea Ki…", FONT_ROW)[0]
+
+    fitted, _ = _fit_text(text, FONT_ROW, max_w)
+
+    assert fitted.endswith("…")
+    assert _text_size(fitted, FONT_ROW)[0] <= max_w
+    longer = text[:len(fitted)] + "…"
+    assert _text_size(longer, FONT_ROW)[0] > max_w
+
+
+def test_fit_text_returns_ellipsis_when_nothing_fits():
+    assert _fit_text("Lando Norris", FONT_ROW, 0)[0] == "…"
+
+
+def test_decode_image_downscales_jpeg_in_draft_mode():
+    """JPEG декодируется сразу уменьшенным, но не меньше запрошенного размера."""
+    buf = BytesIO()
+    Image.new("RGB", (1000, 1200), (200, 10, 10)).save(buf, format="JPEG")
+
+    img = _decode_image(buf.getvalue(), 180)
+
+    assert img.mode == "RGBA"
+    assert 180 <= min(img.size) < 1000
+
+
+def test_standings_render_with_placeholder_is_not_cached():
+    """Таблица с заглушкой вместо фото не кэшируется — следующий рендер снова пробует загрузить аватарку."""
+    rows = (("01", "VER", "Max Verstappen", "100 очк."),)
+    image_render._STANDINGS_PNG_CACHE.clear()
+    with patch.object(image_render, "_get_driver_avatar", return_value=None) as loader:
+        image_render.create_driver_standings_image("T", "S", list(rows), season=2024)
+        image_render.create_driver_standings_image("T", "S", list(rows), season=2024)
+    assert loader.call_count == 2
+    assert not image_render._STANDINGS_PNG_CACHE
+
+    avatar = image_render._placeholder_thumb("VER")
+    with patch.object(image_render, "_get_driver_avatar", return_value=avatar) as loader:
+        first = image_render.create_driver_standings_image("T", "S", list(rows), season=2024).getvalue()
+        second = image_render.create_driver_standings_image("T", "S", list(rows), season=2024).getvalue()
+    assert loader.call_count == 1
+    assert first == second
+    image_render._STANDINGS_PNG_CACHE.clear()
+
+
+def test_openf1_prefetch_retries_after_failure():
+    """Неудачный запрос к OpenF1 не отключает онлайн-фото навсегда: после паузы пробуем снова."""
+    payload = b'[{"name_acronym": "VER", "full_name": "Max Verstappen", "headshot_url": "https://x/ver.png"}]'
+    with patch.object(image_render, "_OPENF1_FETCHED", False), \
+            patch.object(image_render, "_OPENF1_RETRY_AT", 0.0), \
+            patch.object(image_render, "_OPENF1_DRIVERS_CACHE", {}), \
+            patch.object(image_render, "_http_get", side_effect=OSError("dns")) as http_get:
+        image_render._ensure_openf1_drivers()
+        image_render._ensure_openf1_drivers()
+        assert http_get.call_count == 1
+        assert image_render._OPENF1_FETCHED is False
+
+        image_render._OPENF1_RETRY_AT = 0.0
+        http_get.side_effect = None
+        http_get.return_value = payload
+        image_render._ensure_openf1_drivers()
+
+        assert image_render._OPENF1_FETCHED is True
+        assert image_render._get_online_driver_url("VER", "") == "https://x/ver.png"
@@ -2,13 +2,16 @@
 Тесты уведомлений (user/group formatting).
 """
 import io
+import time
 from datetime import datetime, timezone, timedelta
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pandas as pd
 import pytest
+from aiogram.exceptions import TelegramRetryAfter
 from aiogram.types import BufferedInputFile
 
+from app.utils import notifications
 from app.utils.notifications import (
     GROUP_TIMEZONE,
     _voting_closes_at,
@@ -19,7 +22,19 @@ from app.utils.notifications import (
     check_and_notify_voting_results,
     get_notification_text,
 )
-from app.utils.safe_send import safe_send_photo
+from app.utils.safe_send import SharedPhoto, TokenBucket, broadcast, safe_send_message, safe_send_photo
+
+
+@pytest.fixture(autouse=True)
+def _reset_notification_caches():
+    """Каждый тест подставляет своё расписание/пользователей — кэши модуля не должны их перекрывать."""
+    notifications._schedule_cache.clear()
+    notifications._results_idle_until.clear()
+    notifications.invalidate_users_cache()
+    yield
+    notifications._schedule_cache.clear()
+    notifications._results_idle_until.clear()
+    notifications.invalidate_users_cache()
 
 
 def _emit_preview(request: pytest.FixtureRequest, label: str, text: str) -> None:
@@ -101,7 +116,7 @@ async def test_voting_results_do_not_depend_on_external_race_results():
             patch("app.utils.notifications.get_driver_vote_winner", new_callable=AsyncMock) as m_winner, \
             patch("app.utils.notifications.get_driver_full_name_async", new_callable=AsyncMock) as m_name, \
             patch("app.utils.notifications.was_reminder_sent", new_callable=AsyncMock) as m_was_sent, \
-            patch("app.utils.notifications.set_reminder_sent", new_callable=AsyncMock) as m_set_sent, \
+            patch("app.utils.notifications.set_reminders_sent", new_callable=AsyncMock) as m_set_sent, \
             patch("app.utils.notifications.safe_send_message", new_callable=AsyncMock) as m_send:
         m_sched.return_value = schedule
         m_last.return_value = None
@@ -118,6 +133,7 @@ async def test_voting_results_do_not_depend_on_external_race_results():
     assert "4.5" in m_send.await_args.args[2]
     assert "Oscar Piastri" in m_send.await_args.args[2]
     m_set_sent.assert_awaited_once()
+    assert m_set_sent.await_args.args[0] == [(111, datetime.now(timezone.utc).year, 1, False, 10000)]
 
 
 @pytest.mark.asyncio
@@ -137,7 +153,7 @@ async def test_check_and_send_notifications_sends_sprint_events(request: pytest.
             patch("app.utils.notifications.get_users_with_settings", new_callable=AsyncMock) as m_users, \
             patch("app.utils.notifications.get_all_group_chats", new_callable=AsyncMock) as m_groups, \
             patch("app.utils.notifications.was_reminder_sent", new_callable=AsyncMock) as m_was_sent, \
-            patch("app.utils.notifications.set_reminder_sent", new_callable=AsyncMock) as m_set_sent, \
+            patch("app.utils.notifications.set_reminders_sent", new_callable=AsyncMock) as m_set_sent, \
             patch("app.utils.notifications.safe_send_message", new_callable=AsyncMock) as m_send:
         m_sched.return_value = schedule
         m_users.return_value = [(111, "Europe/Moscow", 60, 1)]
@@ -152,7 +168,8 @@ async def test_check_and_send_notifications_sends_sprint_events(request: pytest.
         _emit_preview(request, f"Sent notification #{idx}", preview)
     assert any("Скоро спринт-квалификация" in t for t in sent_texts)
     assert any("Скоро спринт" in t for t in sent_texts)
-    assert m_set_sent.await_count >= 2
+    marked = [row for call in m_set_sent.await_args_list for row in call.args[0]]
+    assert len(marked) >= 2
 
 
 @pytest.mark.asyncio
@@ -199,6 +216,8 @@ async def test_check_and_send_results_does_not_mark_round_when_delivery_failed()
 
     assert m_send_photo.await_count >= 1
     assert m_set_notified.await_count == 0
+    # TeamName есть у всех строк — standings как запасной источник команды не нужны
+    m_driver_st.assert_not_awaited()
 
 
 @pytest.mark.asyncio
@@ -308,6 +327,22 @@ async def test_check_and_notify_quali_does_not_mark_round_when_no_rows():
     assert m_set_notified.await_count == 0
 
 
+@pytest.mark.asyncio
+async def test_check_and_notify_quali_skips_fetch_when_finished_round_already_sent():
+    """Последняя завершённая по расписанию квала уже разослана — результаты не запрашиваются."""
+    quali_start = (datetime.now(timezone.utc) - timedelta(days=2)).isoformat()
+
+    with patch("app.utils.notifications._get_latest_quali_async", new_callable=AsyncMock) as m_latest, \
+            patch("app.utils.notifications.get_last_notified_quali_round", new_callable=AsyncMock) as m_last, \
+            patch("app.utils.notifications.get_season_schedule_short_async", new_callable=AsyncMock) as m_sched:
+        m_last.return_value = 4
+        m_sched.return_value = [{"round": 4, "event_name": "Bahrain GP", "quali_start_utc": quali_start}]
+
+        assert await check_and_notify_quali(bot=object()) is True
+
+    m_latest.assert_not_awaited()
+
+
 @pytest.mark.asyncio
 async def test_check_and_send_results_fallbacks_to_all_users_when_notifications_only_empty():
     """Legacy-режим: если notifications_only пуст, пост-гоночная рассылка идёт всем пользователям."""
@@ -365,6 +400,79 @@ async def test_safe_send_photo_wraps_bytes_for_aiogram():
     assert photo.filename == "f1hub-results.png"
 
 
+@pytest.mark.asyncio
+async def test_safe_send_message_retries_flood_wait_a_bounded_number_of_times():
+    """FloodWait повторяется циклом не больше retries раз, без бесконечной рекурсии."""
+    bot = AsyncMock()
+    bot.send_message.side_effect = TelegramRetryAfter(method=MagicMock(), message="flood", retry_after=0)
+
+    assert await safe_send_message(bot, 111, "text", retries=3) is False
+    assert bot.send_message.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_shared_photo_is_uploaded_once_then_sent_by_file_id():
+    """Картинка рассылки загружается один раз, остальным уходит file_id."""
+    bot = AsyncMock()
+    bot.send_photo.return_value = MagicMock(photo=[MagicMock(file_id="small"), MagicMock(file_id="big")])
+    photo = SharedPhoto(b"png-bytes")
+
+    assert await safe_send_photo(bot, 1, photo) is True
+    assert await safe_send_photo(bot, 2, photo) is True
+
+    first, second = (call.kwargs["photo"] for call in bot.send_photo.await_args_list)
+    assert isinstance(first, BufferedInputFile)
+    assert second == "big"
+
+
+@pytest.mark.asyncio
+async def test_broadcast_counts_successes_and_survives_errors():
+    """Рассылка через пул воркеров доходит до всех получателей, даже если одна отправка упала."""
+    seen = []
+
+    async def send(chat_id):
+        seen.append(chat_id)
+        if chat_id == 3:
+            raise RuntimeError("boom")
+        return chat_id % 2 == 0
+
+    delivered = await broadcast(range(10), send, workers=3)
+
+    assert sorted(seen) == list(range(10))
+    assert delivered == 5
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_allows_burst_then_throttles():
+    """Лимитер пропускает всплеск до capacity, дальше — не чаще rate в секунду."""
+    bucket = TokenBucket(rate=50, capacity=2)
+    started = time.monotonic()
+    await bucket.acquire()
+    await bucket.acquire()
+    assert time.monotonic() - started < 0.01
+
+    await bucket.acquire()
+    await bucket.acquire()
+    assert time.monotonic() - started >= 0.035
+
+
+@pytest.mark.asyncio
+async def test_send_limiter_applies_only_inside_broadcast():
+    """Ответы на команды не ждут лимитер рассылок; отправки из broadcast() — ждут."""
+    bot = MagicMock()
+    bot.send_message = AsyncMock()
+    with patch("app.utils.safe_send.SEND_LIMITER.acquire", new_callable=AsyncMock) as acquire:
+        assert await safe_send_message(bot, 1, "hi") is True
+        assert acquire.await_count == 0
+
+        delivered = await broadcast([2, 3], lambda chat_id: safe_send_message(bot, chat_id, "hi"))
+        assert delivered == 2
+        assert acquire.await_count == 2
+
+        assert await safe_send_message(bot, 4, "hi") is True
+        assert acquire.await_count == 2
+
+
 @pytest.mark.asyncio
 async def test_race_results_wait_until_race_can_be_finished():
     """Live-позиции через 90 минут после старта не рассылаются как финальный результат."""
@@ -383,6 +491,24 @@ async def test_race_results_wait_until_race_can_be_finished():
     assert m_results.await_count == 0
 
 
+@pytest.mark.asyncio
+async def test_race_results_idle_until_next_race_can_finish():
+    """Пока следующая гонка не могла финишировать, повторные тики не ходят в БД и за расписанием."""
+    now = datetime.now(timezone.utc)
+    schedule = [{
+        "round": 8,
+        "event_name": "Spa GP",
+        "race_start_utc": (now - timedelta(minutes=90)).isoformat(),
+    }]
+    with patch("app.utils.notifications.get_season_schedule_short_async", new_callable=AsyncMock) as m_sched, \
+            patch("app.utils.notifications.get_last_notified_round", new_callable=AsyncMock) as m_last:
+        m_sched.return_value = schedule
+        m_last.return_value = 7
+        await check_and_send_results(bot=object())
+        await check_and_send_results(bot=object())
+    assert m_last.await_count == 1
+
+
 @pytest.mark.asyncio
 async def test_race_results_send_image_and_separate_favorites_message():
     """После гонки пользователь получает общую картинку и отдельный текст по избранному."""
@@ -431,6 +557,55 @@ async def test_race_results_send_image_and_separate_favorites_message():
     assert m_set_round.await_count == 1
 
 
+@pytest.mark.asyncio
+async def test_race_results_tolerate_status_strings_in_position():
+    """Статус вместо позиции ("R", NaN) не обрывает рассылку результатов."""
+    now = datetime.now(timezone.utc)
+    schedule = [{
+        "round": 10,
+        "event_name": "Baku GP",
+        "race_start_utc": (now - timedelta(hours=3)).isoformat(),
+    }]
+    results_df = pd.DataFrame([
+        {"Position": 1.0, "Abbreviation": "VER", "FirstName": "Max", "LastName": "Verstappen", "TeamName": "Red Bull", "Points": 0},
+        {"Position": "R", "Abbreviation": "PER", "FirstName": "Sergio", "LastName": "Perez", "TeamName": "Red Bull", "Points": 0},
+        {"Position": float("nan"), "Abbreviation": "NOR", "FirstName": "Lando", "LastName": "Norris", "TeamName": "McLaren", "Points": 0},
+    ])
+
+    async def users_side_effect(notifications_only: bool = False):
+        return [(111, "Europe/Moscow", 60, 1)]
+
+    with patch("app.utils.notifications.get_season_schedule_short_async", new_callable=AsyncMock) as m_sched, \
+            patch("app.utils.notifications.get_last_notified_round", new_callable=AsyncMock) as m_last, \
+            patch("app.utils.notifications.get_race_results_async", new_callable=AsyncMock) as m_results, \
+            patch("app.utils.notifications.get_last_notified_voting_invite_round", new_callable=AsyncMock) as m_invite, \
+            patch("app.utils.notifications.get_users_favorites_for_notifications", new_callable=AsyncMock) as m_favs, \
+            patch("app.utils.notifications.get_all_group_chats", new_callable=AsyncMock) as m_groups, \
+            patch("app.utils.notifications.get_users_with_settings", side_effect=users_side_effect), \
+            patch("app.utils.notifications.get_driver_standings_async", new_callable=AsyncMock) as m_standings, \
+            patch("app.utils.notifications.create_f1_style_classification_image") as m_render, \
+            patch("app.utils.notifications.safe_send_photo", new_callable=AsyncMock) as m_photo, \
+            patch("app.utils.notifications.safe_send_message", new_callable=AsyncMock) as m_message, \
+            patch("app.utils.notifications.RACE_RESULTS_MIN_ROWS", 1), \
+            patch("app.utils.notifications.set_last_notified_round", new_callable=AsyncMock) as m_set_round:
+        m_sched.return_value = schedule
+        m_last.return_value = None
+        m_results.return_value = results_df
+        m_invite.return_value = 10
+        m_favs.return_value = {111: {"drivers": ["PER"], "teams": ["Red Bull", "McLaren"]}}
+        m_groups.return_value = []
+        m_standings.return_value = pd.DataFrame()
+        m_render.return_value = io.BytesIO(b"test-image")
+        m_photo.return_value = True
+        m_message.return_value = True
+        await check_and_send_results(bot=object())
+
+    assert m_photo.await_count == 1
+    assert m_set_round.await_count == 1
+    favorite_texts = [call.args[2] for call in m_message.await_args_list if len(call.args) >= 3]
+    assert any("P1, +25" in text for text in favorite_texts)
+
+
 @pytest.mark.asyncio
 async def test_check_and_notify_quali_fallbacks_to_all_users_when_notifications_only_empty():
     """Legacy-режим: если notifications_only пуст, пост-квали-рассылка идёт всем пользователям."""